@@ -0,0 +1,143 @@
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import time
+import typing as tp
+
+import caesar
+import rsa
+import vigenere
+
+KEY_SIZES = (512, 1024, 2048)
+INPUT_SIZES = {"1KB": 1 << 10, "1MB": 1 << 20, "100MB": 100 << 20}
+KEYWORD = "benchmark"
+DEFAULT_THRESHOLD = 0.2
+MIN_TIME = 0.5
+
+Results = tp.Dict[str, tp.Dict[str, tp.Any]]
+
+
+def synthetic_text(size: int, seed: int = 102) -> str:
+    """
+    ASCII text of letters, digits and punctuation; a random 64 KB block is repeated,
+    so that building 100 MB does not take longer than encrypting it.
+    """
+    rng = random.Random(seed)
+    block = "".join(rng.choices(string.ascii_letters + string.digits + " ,.-\n", k=min(size, 1 << 16)))
+    return (block * (size // len(block) + 1))[:size]
+
+
+def measure(function: tp.Callable[[], tp.Any], min_time: float = MIN_TIME) -> float:
+    """
+    Calls `function` until `min_time` seconds have passed (at least once) and returns calls per second.
+    """
+    calls, elapsed = 0, 0.0
+    start = time.perf_counter()
+    while elapsed < min_time or calls == 0:
+        function()
+        calls += 1
+        elapsed = time.perf_counter() - start
+    return calls / elapsed
+
+
+def benchmark_ciphers(sizes: tp.Iterable[str], min_time: float = MIN_TIME) -> Results:
+    results: Results = {}
+    for label in sizes:
+        text = synthetic_text(INPUT_SIZES[label])
+        megabytes = len(text) / 1e6
+        cases: tp.Dict[str, tp.Callable[[], tp.Any]] = {
+            "caesar.encrypt": lambda: caesar.encrypt_caesar(text, 7),
+            "caesar.decrypt": lambda: caesar.decrypt_caesar(text, 7),
+            "vigenere.encrypt": lambda: vigenere.encrypt_vigenere(text, KEYWORD),
+            "vigenere.decrypt": lambda: vigenere.decrypt_vigenere(text, KEYWORD),
+        }
+        for name, function in cases.items():
+            results[f"{name}[{label}]"] = {"value": measure(function, min_time) * megabytes, "unit": "MB/s"}
+    return results
+
+
+def benchmark_keygen(bits: int, repeat: int = 5) -> float:
+    """
+    Key generation per second. Prime search is random, so a fixed number of keys is timed.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        rsa.generate_keypair(bits=bits)
+    return repeat / (time.perf_counter() - start)
+
+
+def benchmark_rsa(key_sizes: tp.Iterable[int], min_time: float = MIN_TIME, keys: int = 5) -> Results:
+    results: Results = {}
+    for bits in key_sizes:
+        results[f"rsa.keygen[{bits}]"] = {"value": benchmark_keygen(bits, keys), "unit": "ops/s"}
+        public, private = rsa.generate_keypair(bits=bits)
+        message = synthetic_text(rsa.block_size(public[1])).encode()
+        (block,) = rsa.encrypt_bytes(public, message)
+        cases: tp.Dict[str, tp.Callable[[], tp.Any]] = {
+            "rsa.encrypt": lambda: rsa.encrypt_bytes(public, message),
+            "rsa.decrypt": lambda: rsa.decrypt_bytes(private, [block]),
+        }
+        for name, function in cases.items():
+            results[f"{name}[{bits}]"] = {"value": measure(function, min_time), "unit": "ops/s"}
+    return results
+
+
+def compare(results: Results, baseline: Results, threshold: float = DEFAULT_THRESHOLD) -> tp.List[str]:
+    """
+    Names of the benchmarks that are slower than their baseline by more than `threshold` (a fraction).
+    >>> compare({"a": {"value": 70.0}, "b": {"value": 95.0}}, {"a": {"value": 100.0}, "b": {"value": 100.0}}, 0.2)
+    ['a']
+    """
+    return [
+        name
+        for name, result in results.items()
+        if name in baseline and result["value"] < baseline[name]["value"] * (1 - threshold)
+    ]
+
+
+def report(results: Results, baseline: tp.Optional[Results] = None) -> None:
+    print(f"{'benchmark':<26} {'result':>14} {'baseline':>14} {'change':>8}")
+    for name, result in results.items():
+        line = f"{name:<26} {result['value']:>8.1f} {result['unit']:<5}"
+        if baseline and name in baseline:
+            previous = baseline[name]["value"]
+            line += f" {previous:>8.1f} {result['unit']:<5} {result['value'] / previous - 1:>+8.1%}"
+        print(line)
+
+
+def load_results(path: tp.Union[str, os.PathLike]) -> Results:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_results(results: Results, path: tp.Union[str, os.PathLike]) -> None:
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput benchmarks of the homework01 ciphers")
+    parser.add_argument("--sizes", nargs="*", choices=list(INPUT_SIZES), default=list(INPUT_SIZES))
+    parser.add_argument("--bits", nargs="*", type=int, default=list(KEY_SIZES), help="RSA modulus sizes")
+    parser.add_argument("--min-time", dest="min_time", type=float, default=MIN_TIME, help="Seconds per benchmark")
+    parser.add_argument("--baseline", help="JSON file with results to compare against", type=str)
+    parser.add_argument("--save", help="Write the results to this JSON file", type=str)
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown, e.g. 0.2 for 20%%"
+    )
+    args = parser.parse_args()
+
+    results = benchmark_ciphers(args.sizes, args.min_time)
+    results.update(benchmark_rsa(args.bits, args.min_time))
+    baseline = load_results(args.baseline) if args.baseline else None
+    report(results, baseline)
+    if args.save:
+        save_results(results, args.save)
+    if baseline:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"Slower than the baseline by more than {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
@@ -1,6 +1,47 @@
+import argparse
+import mmap
+import os
+import string
+import sys
+import typing as tp
+
+ALPHABET_SIZE = len(string.ascii_uppercase)
+CHUNK_SIZE = 1 << 16
+
+Buffer = tp.Union[bytes, bytearray, memoryview]
+WritableBuffer = tp.Union[bytearray, memoryview, mmap.mmap]
+
+
+def _shifted_table(shift: int) -> tp.Dict[int, int]:
+    """
+    Builds a `str.translate` table that moves every latin letter `shift` positions forward.
+    """
+    shift %= ALPHABET_SIZE
+    upper = string.ascii_uppercase[shift:] + string.ascii_uppercase[:shift]
+    lower = string.ascii_lowercase[shift:] + string.ascii_lowercase[:shift]
+    return str.maketrans(string.ascii_uppercase + string.ascii_lowercase, upper + lower)
+
+
+def _shifted_byte_table(shift: int) -> bytes:
+    """
+    Same as `_shifted_table`, but for `bytes.translate` over ASCII data.
+    """
+    return "".join(map(chr, range(256))).translate(_shifted_table(shift)).encode("latin-1")
+
+
+# Translation tables for every possible shift are built once at import time,
+# so that a call to the cipher is a single pass of `str.translate` in C.
+ENCRYPT_TABLES = [_shifted_table(shift) for shift in range(ALPHABET_SIZE)]
+DECRYPT_TABLES = [_shifted_table(-shift) for shift in range(ALPHABET_SIZE)]
+ENCRYPT_BYTE_TABLES = [_shifted_byte_table(shift) for shift in range(ALPHABET_SIZE)]
+DECRYPT_BYTE_TABLES = [_shifted_byte_table(-shift) for shift in range(ALPHABET_SIZE)]
+
+
 def encrypt_caesar(plaintext: str, shift: int = 3) -> str:
     """
     Encrypts plaintext using a Caesar cipher.
+
+    Throughput target: at least 200 MB/s on multi-megabyte ASCII inputs.
     >>> encrypt_caesar("PYTHON")
     'SBWKRQ'
     >>> encrypt_caesar("python")
@@ -10,30 +51,14 @@ def encrypt_caesar(plaintext: str, shift: int = 3) -> str:
     >>> encrypt_caesar("")
     ''
     """
-    ciphertext = ""
-
-    A_code, Z_code = 65, 90
-    a_code, z_code = 97, 122
-
-    for syl in plaintext:
-        if A_code <= ord(syl) <= Z_code:
-            code = ord(syl) + shift
-            if code > Z_code:
-                code = A_code + code % Z_code - 1
-            syl = chr(code)
-        elif a_code <= ord(syl) <= z_code:
-            code = ord(syl) + shift
-            if code > z_code:
-                code = a_code + code % z_code - 1
-            syl = chr(code)
-        ciphertext += syl
-
-    return ciphertext
+    return plaintext.translate(ENCRYPT_TABLES[shift % ALPHABET_SIZE])
 
 
 def decrypt_caesar(ciphertext: str, shift: int = 3) -> str:
     """
     Decrypts a ciphertext using a Caesar cipher.
+
+    Throughput target: at least 200 MB/s on multi-megabyte ASCII inputs.
     >>> decrypt_caesar("SBWKRQ")
     'PYTHON'
     >>> decrypt_caesar("sbwkrq")
@@ -43,22 +68,134 @@ def decrypt_caesar(ciphertext: str, shift: int = 3) -> str:
     >>> decrypt_caesar("")
     ''
     """
-    plaintext = ""
-
-    A_code, Z_code = 65, 90
-    a_code, z_code = 97, 122
-
-    for syl in ciphertext:
-        if A_code <= ord(syl) <= Z_code:
-            code = ord(syl) - shift
-            if code < A_code:
-                code = Z_code - A_code % code + 1
-            syl = chr(code)
-        elif a_code <= ord(syl) <= z_code:
-            code = ord(syl) - shift
-            if code < a_code:
-                code = z_code - a_code % code + 1
-            syl = chr(code)
-        plaintext += syl
-
-    return plaintext
+    return ciphertext.translate(DECRYPT_TABLES[shift % ALPHABET_SIZE])
+
+
+def _translate_stream(
+    stream: tp.IO[tp.AnyStr], text_table: tp.Dict[int, int], byte_table: bytes, chunk_size: int
+) -> tp.Iterator[tp.AnyStr]:
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk.translate(text_table if isinstance(chunk, str) else byte_table)
+
+
+def encrypt_caesar_stream(
+    stream: tp.IO[tp.AnyStr], shift: int = 3, chunk_size: int = CHUNK_SIZE
+) -> tp.Iterator[tp.AnyStr]:
+    """
+    Encrypts a text or binary file object chunk by chunk, so memory use does not depend on its size.
+    Yields chunks of the same type as the stream reads.
+    >>> import io
+    >>> "".join(encrypt_caesar_stream(io.StringIO("Python3.6"), chunk_size=4))
+    'Sbwkrq3.6'
+    >>> b"".join(encrypt_caesar_stream(io.BytesIO(b"PYTHON"), chunk_size=4))
+    b'SBWKRQ'
+    """
+    shift %= ALPHABET_SIZE
+    return _translate_stream(stream, ENCRYPT_TABLES[shift], ENCRYPT_BYTE_TABLES[shift], chunk_size)
+
+
+def decrypt_caesar_stream(
+    stream: tp.IO[tp.AnyStr], shift: int = 3, chunk_size: int = CHUNK_SIZE
+) -> tp.Iterator[tp.AnyStr]:
+    """
+    Decrypts a text or binary file object chunk by chunk.
+    >>> import io
+    >>> "".join(decrypt_caesar_stream(io.StringIO("Sbwkrq3.6"), chunk_size=4))
+    'Python3.6'
+    """
+    shift %= ALPHABET_SIZE
+    return _translate_stream(stream, DECRYPT_TABLES[shift], DECRYPT_BYTE_TABLES[shift], chunk_size)
+
+
+def _as_bytes(data: Buffer) -> tp.Union[bytes, bytearray]:
+    # A memoryview has no `translate`; only it has to be copied.
+    return data.tobytes() if isinstance(data, memoryview) else data
+
+
+def encrypt_caesar_bytes(data: Buffer, shift: int = 3) -> bytes:
+    """
+    Encrypts ASCII bytes using a Caesar cipher without decoding them to `str`.
+    >>> encrypt_caesar_bytes(b"Python3.6")
+    b'Sbwkrq3.6'
+    >>> encrypt_caesar_bytes(memoryview(b"PYTHON"))
+    b'SBWKRQ'
+    """
+    return bytes(_as_bytes(data).translate(ENCRYPT_BYTE_TABLES[shift % ALPHABET_SIZE]))
+
+
+def decrypt_caesar_bytes(data: Buffer, shift: int = 3) -> bytes:
+    """
+    Decrypts ASCII bytes using a Caesar cipher without decoding them to `str`.
+    >>> decrypt_caesar_bytes(bytearray(b"Sbwkrq3.6"))
+    b'Python3.6'
+    """
+    return bytes(_as_bytes(data).translate(DECRYPT_BYTE_TABLES[shift % ALPHABET_SIZE]))
+
+
+def _translate_inplace(buffer: WritableBuffer, table: bytes, chunk_size: int) -> None:
+    with memoryview(buffer) as view:
+        for start in range(0, len(view), chunk_size):
+            chunk = view[start : start + chunk_size]
+            chunk[:] = chunk.tobytes().translate(table)
+
+
+def encrypt_caesar_inplace(buffer: WritableBuffer, shift: int = 3, chunk_size: int = CHUNK_SIZE) -> None:
+    """
+    Encrypts a writable buffer (bytearray, memoryview, mmap) in place, one chunk at a time.
+    >>> data = bytearray(b"Python3.6")
+    >>> encrypt_caesar_inplace(data)
+    >>> data
+    bytearray(b'Sbwkrq3.6')
+    """
+    _translate_inplace(buffer, ENCRYPT_BYTE_TABLES[shift % ALPHABET_SIZE], chunk_size)
+
+
+def decrypt_caesar_inplace(buffer: WritableBuffer, shift: int = 3, chunk_size: int = CHUNK_SIZE) -> None:
+    """
+    Decrypts a writable buffer (bytearray, memoryview, mmap) in place, one chunk at a time.
+    >>> data = bytearray(b"Sbwkrq3.6")
+    >>> decrypt_caesar_inplace(memoryview(data)[:6])
+    >>> data
+    bytearray(b'Python3.6')
+    """
+    _translate_inplace(buffer, DECRYPT_BYTE_TABLES[shift % ALPHABET_SIZE], chunk_size)
+
+
+def map_file(path: tp.Union[str, os.PathLike], process: tp.Callable[[mmap.mmap], None]) -> None:
+    """
+    Memory-maps the file at `path` for writing and lets `process` modify it in place.
+    """
+    with open(path, "r+b") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0) as mapped:
+            process(mapped)
+            mapped.flush()
+
+
+def encrypt_caesar_mmap(path: tp.Union[str, os.PathLike], shift: int = 3) -> None:
+    """
+    Encrypts an ASCII file in place through a memory map, without reading it into a `str`.
+    """
+    map_file(path, lambda mapped: encrypt_caesar_inplace(mapped, shift))
+
+
+def decrypt_caesar_mmap(path: tp.Union[str, os.PathLike], shift: int = 3) -> None:
+    """
+    Decrypts an ASCII file in place through a memory map, without reading it into a `str`.
+    """
+    map_file(path, lambda mapped: decrypt_caesar_inplace(mapped, shift))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Caesar cipher filter from stdin to stdout")
+    parser.add_argument("-s", "--shift", dest="shift", help="Alphabet shift", type=int, default=3)
+    parser.add_argument("-d", "--decrypt", dest="decrypt", help="Decrypt instead of encrypt", action="store_true")
+    args = parser.parse_args()
+    process = decrypt_caesar_stream if args.decrypt else encrypt_caesar_stream
+    for block in process(sys.stdin.buffer, args.shift):
+        sys.stdout.buffer.write(block)
+    sys.stdout.buffer.flush()
@@ -0,0 +1,211 @@
+import argparse
+import concurrent.futures
+import contextlib
+import dataclasses
+import os
+import pathlib
+import shutil
+import sys
+import tempfile
+import time
+import typing as tp
+
+import caesar
+import rsa
+import vigenere
+
+CIPHERS = ("caesar", "vigenere", "rsa")
+SUFFIX = ".enc"
+
+
+@dataclasses.dataclass(frozen=True)
+class Job:
+    source: pathlib.Path
+    target: pathlib.Path
+    cipher: str
+    key: str
+    decrypt: bool = False
+
+
+@dataclasses.dataclass(frozen=True)
+class FileResult:
+    source: pathlib.Path
+    target: pathlib.Path
+    size: int
+    seconds: float
+    # Why the file could not be processed; the other fields are then zero
+    error: tp.Optional[str] = None
+
+    @property
+    def throughput(self) -> float:
+        return self.size / 1e6 / self.seconds if self.seconds else 0.0
+
+
+def collect_files(paths: tp.Iterable[tp.Union[str, os.PathLike]]) -> tp.List[tp.Tuple[pathlib.Path, pathlib.Path]]:
+    """
+    Expands directories into the files below them. Returns `(file, root)` pairs, where `root`
+    is the argument the file was found under, to keep the layout of directories in the output.
+    """
+    files: tp.List[tp.Tuple[pathlib.Path, pathlib.Path]] = []
+    for path in map(pathlib.Path, paths):
+        if path.is_dir():
+            files.extend((file, path) for file in sorted(path.rglob("*")) if file.is_file())
+        else:
+            files.append((path, path.parent))
+    return files
+
+
+def target_path(
+    source: pathlib.Path, root: pathlib.Path, decrypt: bool, output_dir: tp.Optional[pathlib.Path] = None
+) -> pathlib.Path:
+    """
+    Encrypted files get the `.enc` suffix, decrypted ones lose it (or get `.dec` without it).
+    >>> target_path(pathlib.Path("docs/a.txt"), pathlib.Path("docs"), False, pathlib.Path("out")).as_posix()
+    'out/a.txt.enc'
+    >>> target_path(pathlib.Path("docs/a.txt.enc"), pathlib.Path("docs"), True).as_posix()
+    'docs/a.txt'
+    """
+    if not decrypt:
+        name = source.name + SUFFIX
+    elif source.suffix == SUFFIX:
+        name = source.stem
+    else:
+        name = source.name + ".dec"
+    directory = source.parent if output_dir is None else output_dir / source.parent.relative_to(root)
+    return directory / name
+
+
+@contextlib.contextmanager
+def atomic_write(target: pathlib.Path, mode_from: tp.Optional[pathlib.Path] = None) -> tp.Iterator[pathlib.Path]:
+    """
+    Yields a temporary path next to `target` and renames it over `target` only when the
+    block succeeds, so readers never see a partially written file. The temporary file is
+    created with mode 0600; when `mode_from` is given, its permissions are copied instead.
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, name = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        yield pathlib.Path(name)
+        if mode_from is not None:
+            shutil.copymode(mode_from, name)
+        os.replace(name, target)
+    except BaseException:
+        os.unlink(name)
+        raise
+
+
+def _stream_cipher(job: Job, stream: tp.IO[bytes]) -> tp.Iterator[bytes]:
+    if job.cipher == "caesar":
+        shift = int(job.key)
+        if job.decrypt:
+            return caesar.decrypt_caesar_stream(stream, shift)
+        return caesar.encrypt_caesar_stream(stream, shift)
+    if job.decrypt:
+        return vigenere.decrypt_vigenere_stream(stream, job.key)
+    return vigenere.encrypt_vigenere_stream(stream, job.key)
+
+
+def process_file(job: Job) -> FileResult:
+    start = time.perf_counter()
+    with atomic_write(job.target, job.source) as temporary:
+        if job.cipher == "rsa":
+            if job.decrypt:
+                rsa.decrypt_file(rsa.PrivateKey.load(job.key), job.source, temporary)
+            else:
+                rsa.encrypt_file(rsa.load_public_key(job.key), job.source, temporary)
+        else:
+            with open(job.source, "rb") as src, open(temporary, "wb") as dst:
+                for chunk in _stream_cipher(job, src):
+                    dst.write(chunk)
+    return FileResult(job.source, job.target, job.source.stat().st_size, time.perf_counter() - start)
+
+
+def run(
+    jobs: tp.Sequence[Job], max_workers: tp.Optional[int] = None, verbose: bool = True
+) -> tp.Tuple[tp.List[FileResult], float]:
+    """
+    Processes the jobs on a process pool and returns the per-file results in completion order
+    together with the wall time of the whole run. A file that cannot be read, written or
+    decrypted gets a result with `error` set instead of stopping the other files.
+    """
+    start = time.perf_counter()
+    results = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers) as pool:
+        futures = {pool.submit(process_file, job): job for job in jobs}
+        for future in concurrent.futures.as_completed(futures):
+            job = futures[future]
+            try:
+                result = future.result()
+            except (OSError, ValueError) as error:
+                result = FileResult(job.source, job.target, 0, 0.0, str(error))
+            results.append(result)
+            if verbose and result.error is not None:
+                print(f"{result.source}: {result.error}", file=sys.stderr)
+            elif verbose:
+                print(f"{result.source} -> {result.target}: {result.size} B, {result.throughput:.1f} MB/s")
+    return results, time.perf_counter() - start
+
+
+def validate_key(cipher: str, key: str, decrypt: bool = False) -> None:
+    if cipher == "caesar" and not key.lstrip("-").isdigit():
+        raise ValueError("The Caesar key must be an integer shift")
+    if cipher == "vigenere" and not (key.isascii() and key.isalpha()):
+        raise ValueError("The Vigenere key must be a latin keyword")
+    if cipher == "rsa":
+        # Encrypting needs only the recipient's public key
+        rsa.PrivateKey.load(key) if decrypt else rsa.load_public_key(key)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Encrypt or decrypt many files in parallel")
+    parser.add_argument("cipher", choices=CIPHERS)
+    parser.add_argument("action", choices=("encrypt", "decrypt"))
+    parser.add_argument("paths", nargs="+", help="Files or directories")
+    parser.add_argument(
+        "-k",
+        "--key",
+        required=True,
+        help="Caesar shift, Vigenere keyword or path to an RSA key (public to encrypt, private to decrypt)",
+    )
+    parser.add_argument("-o", "--output", dest="output", help="Output directory (default: next to the input)")
+    parser.add_argument("-j", "--jobs", dest="jobs", type=int, default=None, help="Worker processes")
+    parser.add_argument(
+        "--new-key",
+        dest="new_key",
+        type=int,
+        metavar="BITS",
+        help="Generate an RSA key of BITS bits first: the private key into --key, the public one into --key.pub",
+    )
+    args = parser.parse_args()
+
+    if args.new_key:
+        if args.cipher != "rsa":
+            parser.error("--new-key only applies to rsa")
+        public, private = rsa.generate_keypair(bits=args.new_key)
+        private.save(args.key)
+        rsa.save_public_key(public, args.key + ".pub")
+    decrypt = args.action == "decrypt"
+    try:
+        validate_key(args.cipher, args.key, decrypt)
+    except (ValueError, OSError) as error:
+        parser.error(str(error))
+    missing = [path for path in args.paths if not os.path.exists(path)]
+    if missing:
+        parser.error(f"No such file or directory: {', '.join(missing)}")
+    output = pathlib.Path(args.output) if args.output else None
+    jobs = [
+        Job(source, target_path(source, root, decrypt, output), args.cipher, args.key, decrypt)
+        for source, root in collect_files(args.paths)
+    ]
+    if not jobs:
+        sys.exit("No input files")
+    results, seconds = run(jobs, args.jobs)
+    failed = sum(result.error is not None for result in results)
+    total = sum(result.size for result in results)
+    print(
+        f"{len(results) - failed} files ({failed} failed), {total} B in {seconds:.2f} s: "
+        f"{total / 1e6 / seconds:.1f} MB/s"
+    )
+    if failed:
+        sys.exit(1)
@@ -0,0 +1,86 @@
+import concurrent.futures
+import itertools
+import typing as tp
+
+import rsa
+
+# Blocks handed to a worker at once: big enough to amortize pickling of the results.
+CHUNK_BLOCKS = 512
+# Below this many blocks the startup of a process pool costs more than it saves.
+MIN_PARALLEL_BLOCKS = 4096
+MIN_PARALLEL_JOBS = 64
+
+Message = tp.Union[str, bytes]
+
+
+def _chunks(items: tp.Sequence, size: int) -> tp.List[tp.Sequence]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def _map(
+    function: tp.Callable,
+    *iterables: tp.Iterable,
+    parallel: bool,
+    max_workers: tp.Optional[int],
+    chunksize: int = 1,
+) -> tp.List:
+    # `Executor.map` returns results in the order of the arguments, whatever finishes first.
+    if not parallel:
+        return list(map(function, *iterables))
+    with concurrent.futures.ProcessPoolExecutor(max_workers) as pool:
+        return list(pool.map(function, *iterables, chunksize=chunksize))
+
+
+def encrypt_bytes_parallel(
+    pk: tp.Tuple[int, int],
+    data: bytes,
+    chunk_blocks: int = CHUNK_BLOCKS,
+    max_workers: tp.Optional[int] = None,
+    min_parallel_blocks: int = MIN_PARALLEL_BLOCKS,
+) -> tp.List[int]:
+    """
+    Same result as `rsa.encrypt_bytes`, computed by a process pool over chunks of `chunk_blocks` blocks.
+    Inputs shorter than `min_parallel_blocks` blocks are encrypted serially.
+    """
+    size = rsa.block_size(pk[1])
+    chunks = _chunks(data, size * chunk_blocks)
+    parallel = len(chunks) > 1 and len(data) >= size * min_parallel_blocks
+    parts = _map(rsa.encrypt_bytes, itertools.repeat(pk), chunks, parallel=parallel, max_workers=max_workers)
+    return list(itertools.chain.from_iterable(parts))
+
+
+def decrypt_bytes_parallel(
+    pk: rsa.PrivateKeyLike,
+    blocks: tp.Sequence[int],
+    chunk_blocks: int = CHUNK_BLOCKS,
+    max_workers: tp.Optional[int] = None,
+    min_parallel_blocks: int = MIN_PARALLEL_BLOCKS // 16,
+) -> bytes:
+    """
+    Same result as `rsa.decrypt_bytes`, computed by a process pool. Decryption is far more
+    expensive than encryption with a small public exponent, so the pool pays off sooner.
+    """
+    chunks = _chunks(blocks, chunk_blocks)
+    parallel = len(chunks) > 1 and len(blocks) >= min_parallel_blocks
+    parts = _map(rsa.decrypt_bytes, itertools.repeat(pk), chunks, parallel=parallel, max_workers=max_workers)
+    return b"".join(parts)
+
+
+def _encrypt_job(pk: tp.Tuple[int, int], message: Message) -> tp.List[int]:
+    return rsa.encrypt_bytes(pk, message.encode() if isinstance(message, str) else message)
+
+
+def encrypt_many(
+    jobs: tp.Sequence[tp.Tuple[tp.Tuple[int, int], Message]],
+    chunk_size: int = 16,
+    max_workers: tp.Optional[int] = None,
+    min_parallel_jobs: int = MIN_PARALLEL_JOBS,
+) -> tp.List[tp.List[int]]:
+    """
+    Encrypts every `(public key, message)` job with `rsa.encrypt_bytes`, e.g. one message for
+    many recipients. Results come in the order of the jobs; `chunk_size` jobs are sent to
+    a worker at once.
+    """
+    parallel = len(jobs) >= min_parallel_jobs
+    keys, messages = [job[0] for job in jobs], [job[1] for job in jobs]
+    return _map(_encrypt_job, keys, messages, parallel=parallel, max_workers=max_workers, chunksize=chunk_size)
@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+
+import benchmark
+
+
+class BenchmarkTestCase(unittest.TestCase):
+    def test_synthetic_text(self):
+        text = benchmark.synthetic_text(100000)
+        self.assertEqual(100000, len(text))
+        self.assertTrue(text.isascii())
+        self.assertEqual(text, benchmark.synthetic_text(100000))
+
+    def test_benchmark_ciphers(self):
+        results = benchmark.benchmark_ciphers(["1KB"], min_time=0.01)
+        self.assertEqual(
+            {"caesar.encrypt[1KB]", "caesar.decrypt[1KB]", "vigenere.encrypt[1KB]", "vigenere.decrypt[1KB]"},
+            set(results),
+        )
+        for result in results.values():
+            self.assertEqual("MB/s", result["unit"])
+            self.assertGreater(result["value"], 0)
+
+    def test_benchmark_rsa(self):
+        results = benchmark.benchmark_rsa([128], min_time=0.01, keys=1)
+        self.assertEqual({"rsa.keygen[128]", "rsa.encrypt[128]", "rsa.decrypt[128]"}, set(results))
+
+    def test_compare(self):
+        baseline = {"a": {"value": 100.0}, "b": {"value": 100.0}, "c": {"value": 100.0}}
+        results = {"a": {"value": 85.0}, "b": {"value": 70.0}, "d": {"value": 1.0}}
+        self.assertEqual(["b"], benchmark.compare(results, baseline, threshold=0.2))
+        self.assertEqual(["a", "b"], benchmark.compare(results, baseline, threshold=0.1))
+
+    def test_save_load(self):
+        results = benchmark.benchmark_ciphers(["1KB"], min_time=0.01)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "baseline.json")
+            benchmark.save_results(results, path)
+            self.assertEqual(results, benchmark.load_results(path))
@@ -1,5 +1,8 @@
+import io
+import os
 import random
 import string
+import tempfile
 import unittest
 
 import caesar
@@ -51,3 +54,26 @@ class CaesarTestCase(unittest.TestCase):
             caesar.decrypt_caesar(ciphertext, shift=shift),
             msg=f"shift={shift}, ciphertext={ciphertext}",
         )
+
+    def test_stream(self):
+        plaintext = "".join(random.choice(string.ascii_letters + " -,") for _ in range(1000))
+        ciphertext = caesar.encrypt_caesar(plaintext, shift=7)
+        for chunk_size in (1, 7, 64, 4096):
+            with self.subTest(chunk_size=chunk_size):
+                chunks = list(caesar.encrypt_caesar_stream(io.StringIO(plaintext), 7, chunk_size))
+                self.assertEqual(ciphertext, "".join(chunks))
+                chunks = list(caesar.decrypt_caesar_stream(io.BytesIO(ciphertext.encode()), 7, chunk_size))
+                self.assertEqual(plaintext.encode(), b"".join(chunks))
+
+    def test_mmap(self):
+        plaintext = "".join(random.choice(string.ascii_letters + " -,") for _ in range(100000))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "data.txt")
+            with open(path, "w") as f:
+                f.write(plaintext)
+            caesar.encrypt_caesar_mmap(path, shift=11)
+            with open(path) as f:
+                self.assertEqual(caesar.encrypt_caesar(plaintext, shift=11), f.read())
+            caesar.decrypt_caesar_mmap(path, shift=11)
+            with open(path) as f:
+                self.assertEqual(plaintext, f.read())
@@ -0,0 +1,82 @@
+import os
+import pathlib
+import tempfile
+import unittest
+
+import cipher
+import rsa
+
+
+class CipherCLITestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmpdir.name)
+        self.inputs = self.root / "in"
+        (self.inputs / "sub").mkdir(parents=True)
+        (self.inputs / "a.txt").write_bytes(b"Attack at dawn!\n" * 1000)
+        (self.inputs / "sub" / "b.txt").write_bytes(os.urandom(5000))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def round_trip(self, name, key, decrypt_key=None):
+        for decrypt, source, target in ((False, "in", "enc"), (True, "enc", "dec")):
+            job_key = decrypt_key if decrypt and decrypt_key else key
+            jobs = [
+                cipher.Job(path, cipher.target_path(path, root, decrypt, self.root / target), name, job_key, decrypt)
+                for path, root in cipher.collect_files([self.root / source])
+            ]
+            results, _ = cipher.run(jobs, max_workers=2, verbose=False)
+            self.assertEqual(2, len(results))
+        for path in ("a.txt", "sub/b.txt"):
+            self.assertTrue((self.root / "enc" / (path + ".enc")).exists())
+            self.assertEqual((self.inputs / path).read_bytes(), (self.root / "dec" / path).read_bytes())
+        leftovers = [path for path in self.root.rglob("*") if path.name.endswith(".tmp")]
+        self.assertEqual([], leftovers)
+
+    def test_caesar(self):
+        self.round_trip("caesar", "5")
+
+    def test_vigenere(self):
+        self.round_trip("vigenere", "lemon")
+
+    def test_rsa(self):
+        key = self.root / "key"
+        public, private = rsa.generate_keypair(bits=256)
+        private.save(key)
+        self.round_trip("rsa", str(key))
+
+        rsa.save_public_key(public, self.root / "key.pub")
+        self.assertEqual((private.e, private.n), rsa.load_public_key(self.root / "key.pub"))
+        cipher.validate_key("rsa", str(self.root / "key.pub"))
+        with self.assertRaises(ValueError):
+            cipher.validate_key("rsa", str(self.root / "key.pub"), decrypt=True)
+        self.round_trip("rsa", str(self.root / "key.pub"), decrypt_key=str(key))
+
+    def test_file_mode(self):
+        source = self.inputs / "a.txt"
+        source.chmod(0o644)
+        job = cipher.Job(source, self.root / "a.txt.enc", "caesar", "3")
+        cipher.process_file(job)
+        self.assertEqual(0o644, job.target.stat().st_mode & 0o777)
+
+    def test_run_errors(self):
+        jobs = [
+            cipher.Job(path, cipher.target_path(path, root, False, self.root / "enc"), "caesar", "3")
+            for path, root in cipher.collect_files([self.inputs, self.root / "missing.txt"])
+        ]
+        results, _ = cipher.run(jobs, max_workers=2, verbose=False)
+        self.assertEqual(3, len(results))
+        failed = [result for result in results if result.error is not None]
+        self.assertEqual([self.root / "missing.txt"], [result.source for result in failed])
+        self.assertTrue((self.root / "enc" / "a.txt.enc").exists())
+        self.assertTrue((self.root / "enc" / "sub" / "b.txt.enc").exists())
+
+    def test_atomic_write(self):
+        target = self.root / "out" / "file"
+        with self.assertRaises(RuntimeError):
+            with cipher.atomic_write(target) as temporary:
+                temporary.write_bytes(b"partial")
+                raise RuntimeError
+        self.assertFalse(target.exists())
+        self.assertEqual([], list(target.parent.iterdir()))
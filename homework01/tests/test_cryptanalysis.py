@@ -0,0 +1,57 @@
+import random
+import unittest
+
+import caesar
+import cryptanalysis
+import vigenere
+
+PLAINTEXT = (
+    "It was the best of times, it was the worst of times, it was the age of wisdom, "
+    "it was the age of foolishness, it was the epoch of belief, it was the epoch of incredulity, "
+    "it was the season of Light, it was the season of Darkness, it was the spring of hope, "
+    "it was the winter of despair, we had everything before us, we had nothing before us, "
+    "we were all going direct to Heaven, we were all going direct the other way - in short, "
+    "the period was so far like the present period, that some of its noisiest authorities "
+    "insisted on its being received, for good or for evil, in the superlative degree of comparison only."
+)
+
+
+class CryptanalysisTestCase(unittest.TestCase):
+    def test_letter_counts(self):
+        counts = cryptanalysis.letter_counts("Hello, World!")
+        self.assertEqual(26, len(counts))
+        self.assertEqual(3, counts[ord("L") - ord("A")])
+        self.assertEqual(10, sum(counts))
+
+    def test_index_of_coincidence(self):
+        self.assertEqual(0.0, cryptanalysis.index_of_coincidence([1] + [0] * 25))
+        self.assertAlmostEqual(1 / 3, cryptanalysis.index_of_coincidence([2, 2] + [0] * 24))
+
+    def test_crack_caesar(self):
+        for shift in range(26):
+            with self.subTest(shift=shift):
+                ciphertext = caesar.encrypt_caesar(PLAINTEXT, shift)
+                self.assertEqual((shift, PLAINTEXT), cryptanalysis.crack_caesar(ciphertext))
+
+    def test_crack_caesar_many(self):
+        shifts = [random.randrange(26) for _ in range(50)]
+        ciphertexts = [caesar.encrypt_caesar(PLAINTEXT, shift) for shift in shifts]
+        expected = [(shift, PLAINTEXT) for shift in shifts]
+        self.assertEqual(expected, cryptanalysis.crack_caesar_many(ciphertexts))
+
+    def test_crack_vigenere(self):
+        for keyword in ("LEMON", "KEY", "DICKENS", "CRYPTANALYSIS"):
+            with self.subTest(keyword=keyword):
+                ciphertext = vigenere.encrypt_vigenere(PLAINTEXT, keyword)
+                self.assertEqual(len(keyword), cryptanalysis.estimate_key_length(ciphertext))
+                self.assertEqual((keyword, PLAINTEXT), cryptanalysis.crack_vigenere(ciphertext))
+
+    def test_crack_vigenere_many(self):
+        rng = random.Random(5)
+        keywords = ["".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(n)) for n in range(1, 13)]
+        ciphertexts = [vigenere.encrypt_vigenere(PLAINTEXT, keyword) for keyword in keywords]
+        ciphertexts += ["", "12 34!", "Qq", "Привет, мир"]
+        results = cryptanalysis.crack_vigenere_many(ciphertexts)
+        self.assertEqual([cryptanalysis.crack_vigenere(ciphertext) for ciphertext in ciphertexts], results)
+        self.assertEqual([(keyword, PLAINTEXT) for keyword in keywords], results[: len(keywords)])
+        self.assertEqual([], cryptanalysis.crack_vigenere_many([]))
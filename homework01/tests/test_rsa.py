@@ -1,4 +1,6 @@
+import os
 import random
+import tempfile
 import unittest
 
 import rsa
@@ -17,6 +19,12 @@ class RSATestCase(unittest.TestCase):
         self.assertTrue(rsa.is_prime(7))
         self.assertFalse(rsa.is_prime(8))
         self.assertTrue(rsa.is_prime(3571))
+        self.assertFalse(rsa.is_prime(561))
+        self.assertFalse(rsa.is_prime(1009 * 1013))
+        self.assertTrue(rsa.is_prime(2**61 - 1))
+        self.assertFalse(rsa.is_prime(3825123056546413051))
+        self.assertTrue(rsa.is_prime(2**521 - 1))
+        self.assertFalse(rsa.is_prime((2**521 - 1) * (2**127 - 1)))
 
     def test_gcd(self):
         self.assertEqual(0, rsa.gcd(0, 0))
@@ -43,4 +51,74 @@ class RSATestCase(unittest.TestCase):
         self.assertEqual(((142169, 1697249), (734969, 1697249)), rsa.generate_keypair(1229, 1381))
         self.assertEqual(
             ((9678731, 11188147), (1804547, 11188147)), rsa.generate_keypair(3259, 3433)
-        )
\ No newline at end of file
+        )
+
+    def test_generate_keypair_bits(self):
+        for bits in (64, 512):
+            with self.subTest(bits=bits):
+                (e, n), (d, n_private) = rsa.generate_keypair(bits=bits)
+                self.assertEqual(n, n_private)
+                self.assertEqual(bits, n.bit_length())
+                self.assertEqual(42, pow(pow(42, e, n), d, n))
+        with self.assertRaises(ValueError):
+            rsa.generate_keypair(17, 19, bits=64)
+
+    def test_encrypt_decrypt(self):
+        public, private = rsa.generate_keypair(1229, 1381)
+        message = "Привет, RSA!"
+        self.assertEqual(message, rsa.decrypt(private, rsa.encrypt(public, message)))
+
+    def test_encrypt_bytes(self):
+        public, private = rsa.generate_keypair(bits=256)
+        for data in (b"", b"\x00", b"\x00\x00RSA", os.urandom(1000)):
+            with self.subTest(size=len(data)):
+                blocks = rsa.encrypt_bytes(public, data)
+                self.assertEqual(-(-len(data) // rsa.block_size(public[1])), len(blocks))
+                self.assertEqual(data, rsa.decrypt_bytes(private, blocks))
+        with self.assertRaises(ValueError):
+            rsa.encrypt_bytes((121, 323), b"RSA")
+
+    def test_encrypt_file(self):
+        public, private = rsa.generate_keypair(bits=128)
+        data = os.urandom(100000)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = [os.path.join(tmpdir, name) for name in ("plain", "cipher", "decrypted")]
+            with open(paths[0], "wb") as f:
+                f.write(data)
+            rsa.encrypt_file(public, paths[0], paths[1])
+            rsa.decrypt_file(private, paths[1], paths[2])
+            with open(paths[2], "rb") as f:
+                self.assertEqual(data, f.read())
+
+    def test_private_key(self):
+        public, private = rsa.generate_keypair(bits=512)
+        self.assertIsInstance(private, rsa.PrivateKey)
+        d, n = private
+        self.assertEqual((d, n), private)
+        self.assertEqual(public[1], n)
+        blocks = rsa.encrypt_bytes(public, b"Chinese Remainder Theorem")
+        self.assertEqual(rsa.decrypt_bytes((d, n), blocks), rsa.decrypt_bytes(private, blocks))
+        self.assertEqual("CRT", rsa.decrypt(private, rsa.encrypt(public, "CRT")))
+        with self.assertRaises(AttributeError):
+            private.comment = "keys have no __dict__"
+
+        for p, q in ((2, 11), (13, 2)):
+            (e, n), private = rsa.generate_keypair(p, q)
+            self.assertEqual(list(range(n)), [private.decrypt(pow(m, e, n)) for m in range(n)])
+
+    def test_private_key_file(self):
+        _, private = rsa.generate_keypair(bits=256)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "key")
+            private.save(path)
+            loaded = rsa.PrivateKey.load(path)
+            self.assertEqual(private, loaded)
+            self.assertEqual(private.qinv, loaded.qinv)
+            self.assertEqual(0o600, os.stat(path).st_mode & 0o777)
+            with open(path, "w") as f:
+                f.write("not a key\n")
+            with self.assertRaises(ValueError):
+                rsa.PrivateKey.load(path)
+            os.chmod(path, 0o644)
+            private.save(path)
+            self.assertEqual(0o600, os.stat(path).st_mode & 0o777)
@@ -0,0 +1,34 @@
+import os
+import unittest
+
+import rsa
+import rsa_batch
+
+
+class RSABatchTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.public, cls.private = rsa.generate_keypair(bits=256)
+
+    def test_encrypt_bytes_parallel(self):
+        data = os.urandom(10000)
+        expected = rsa.encrypt_bytes(self.public, data)
+        for min_parallel_blocks in (0, rsa_batch.MIN_PARALLEL_BLOCKS):
+            with self.subTest(min_parallel_blocks=min_parallel_blocks):
+                blocks = rsa_batch.encrypt_bytes_parallel(
+                    self.public, data, chunk_blocks=50, max_workers=2, min_parallel_blocks=min_parallel_blocks
+                )
+                self.assertEqual(expected, blocks)
+
+    def test_decrypt_bytes_parallel(self):
+        data = os.urandom(10000)
+        blocks = rsa.encrypt_bytes(self.public, data)
+        decrypted = rsa_batch.decrypt_bytes_parallel(self.private, blocks, chunk_blocks=50, min_parallel_blocks=0)
+        self.assertEqual(data, decrypted)
+
+    def test_encrypt_many(self):
+        keys = [self.public, rsa.generate_keypair(bits=128)[0], rsa.generate_keypair(bits=512)[0]]
+        jobs = [(keys[i % len(keys)], f"message #{i}") for i in range(30)]
+        expected = [rsa.encrypt_bytes(key, message.encode()) for key, message in jobs]
+        self.assertEqual(expected, rsa_batch.encrypt_many(jobs, chunk_size=4, min_parallel_jobs=0))
+        self.assertEqual(expected, rsa_batch.encrypt_many(jobs))
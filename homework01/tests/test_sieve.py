@@ -0,0 +1,50 @@
+import os
+import random
+import tempfile
+import unittest
+
+import rsa
+import sieve
+
+
+class PrimeSieveTestCase(unittest.TestCase):
+    def test_build(self):
+        for limit in (0, 2, 3, 17, 100, 1000, 54321):
+            with self.subTest(limit=limit):
+                primes = sieve.PrimeSieve.build(limit, segment_size=64)
+                expected = [n for n in range(limit) if rsa.is_prime(n)]
+                self.assertEqual(expected, [n for n in range(limit) if primes.is_prime(n)])
+        for segment_size in (0, 1, 7, 13):
+            with self.subTest(segment_size=segment_size):
+                primes = sieve.PrimeSieve.build(1000, segment_size=segment_size)
+                self.assertEqual(sieve.PrimeSieve.build(1000).bits, primes.bits)
+
+    def test_out_of_range(self):
+        primes = sieve.PrimeSieve.build(100)
+        self.assertIn(99, primes)
+        self.assertNotIn(100, primes)
+        with self.assertRaises(ValueError):
+            primes.is_prime(101)
+
+    def test_cached(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "primes.bin")
+            built = sieve.PrimeSieve.cached(path, 10**5)
+            loaded = sieve.PrimeSieve.cached(path, 5 * 10**4)
+            self.assertEqual(10**5, loaded.limit)
+            for n in random.sample(range(10**5), 1000):
+                self.assertEqual(built.is_prime(n), loaded.is_prime(n))
+            bigger = sieve.PrimeSieve.cached(path, 2 * 10**5)
+            self.assertEqual(2 * 10**5, bigger.limit)
+            for primes in (built, loaded, bigger):
+                primes.close()
+
+    def test_rsa_prime_cache(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            try:
+                rsa.use_prime_cache(10**4, os.path.join(tmpdir, "primes.bin"))
+                self.assertTrue(rsa.is_prime(9973))
+                self.assertFalse(rsa.is_prime(9999))
+                self.assertTrue(rsa.is_prime(10007))
+            finally:
+                rsa.use_prime_cache(None)
@@ -1,5 +1,8 @@
+import io
+import os
 import random
 import string
+import tempfile
 import unittest
 
 import vigenere
@@ -39,4 +42,61 @@ class VigenereTestCase(unittest.TestCase):
         keyword = ''.join(random.choice(string.ascii_letters) for _ in range(kwlen))
         plaintext = ''.join(random.choice(string.ascii_letters + ' -,') for _ in range(64))
         ciphertext = vigenere.encrypt_vigenere(plaintext, keyword)
-        self.assertEqual(plaintext, vigenere.decrypt_vigenere(ciphertext, keyword))
\ No newline at end of file
+        self.assertEqual(plaintext, vigenere.decrypt_vigenere(ciphertext, keyword))
+
+    def test_non_ascii(self):
+        plaintext = "Привет, Python! " * 4
+        ciphertext = vigenere.encrypt_vigenere(plaintext, "lemon")
+        self.assertEqual("Привет, Dlelab! ", ciphertext[:16])
+        self.assertEqual(plaintext, vigenere.decrypt_vigenere(ciphertext, "lemon"))
+
+    def test_empty_keyword(self):
+        calls = (
+            lambda: vigenere.encrypt_vigenere("abc", ""),
+            lambda: vigenere.decrypt_vigenere_bytes(b"abc", ""),
+            lambda: list(vigenere.encrypt_vigenere_stream(io.StringIO("abc"), "")),
+            lambda: vigenere.encrypt_vigenere_inplace(bytearray(b"abc"), ""),
+        )
+        for call in calls:
+            with self.assertRaises(ValueError):
+                call()
+
+    def test_stream(self):
+        keyword = "lemon"
+        plaintext = "".join(random.choice(string.ascii_letters + " -,") for _ in range(1000))
+        ciphertext = vigenere.encrypt_vigenere(plaintext, keyword)
+        for chunk_size in (1, 3, 5, 64, 4096):
+            with self.subTest(chunk_size=chunk_size):
+                chunks = list(vigenere.encrypt_vigenere_stream(io.StringIO(plaintext), keyword, chunk_size))
+                self.assertEqual(ciphertext, "".join(chunks))
+                chunks = list(vigenere.decrypt_vigenere_stream(io.BytesIO(ciphertext.encode()), keyword, chunk_size))
+                self.assertEqual(plaintext.encode(), b"".join(chunks))
+
+    def test_mmap(self):
+        keyword = "python"
+        plaintext = "".join(random.choice(string.ascii_letters + " -,") for _ in range(100000))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "data.txt")
+            with open(path, "w") as f:
+                f.write(plaintext)
+            vigenere.encrypt_vigenere_mmap(path, keyword)
+            with open(path) as f:
+                self.assertEqual(vigenere.encrypt_vigenere(plaintext, keyword), f.read())
+            vigenere.decrypt_vigenere_mmap(path, keyword)
+            with open(path) as f:
+                self.assertEqual(plaintext, f.read())
+
+
+    @unittest.skipIf(vigenere.np is None, "NumPy is not installed")
+    def test_numpy_backend(self):
+        keyword = "".join(random.choice(string.ascii_letters) for _ in range(random.randint(1, 24)))
+        data = bytes(random.randrange(256) for _ in range(5000))
+        for encrypt in (vigenere.encrypt_vigenere_bytes, vigenere.decrypt_vigenere_bytes):
+            with self.subTest(function=encrypt.__name__, keyword=keyword):
+                self.assertEqual(encrypt(data, keyword, backend="python"), encrypt(data, keyword, backend="numpy"))
+
+    def test_backend(self):
+        self.assertEqual("LXFOPVEFRNHR", vigenere.encrypt_vigenere("ATTACKATDAWN", "LEMON", backend="numpy"))
+        self.assertEqual("ATTACKATDAWN", vigenere.decrypt_vigenere("LXFOPVEFRNHR", "LEMON", backend="python"))
+        with self.assertRaises(ValueError):
+            vigenere.encrypt_vigenere("ATTACKATDAWN", "LEMON", backend="gpu")
@@ -1,6 +1,108 @@
-def encrypt_vigenere(plaintext: str, keyword: str) -> str:
+import argparse
+import os
+import string
+import sys
+import typing as tp
+
+from caesar import (
+    CHUNK_SIZE,
+    DECRYPT_BYTE_TABLES,
+    DECRYPT_TABLES,
+    ENCRYPT_BYTE_TABLES,
+    ENCRYPT_TABLES,
+    Buffer,
+    WritableBuffer,
+    map_file,
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+ENCODE = {letter: shift for shift, letter in enumerate(string.ascii_uppercase)}
+BACKENDS = ("auto", "python", "numpy")
+# Below this size the setup of NumPy arrays costs more than slicing with `bytes.translate`.
+NUMPY_THRESHOLD = 1 << 16
+
+
+def _keyword_shifts(keyword: str) -> tp.List[int]:
+    if not keyword:
+        raise ValueError("The keyword must not be empty")
+    return [ENCODE[letter] for letter in keyword.upper()]
+
+
+def _interleave(text: tp.AnyStr, result: tp.MutableSequence, tables: tp.Sequence, shifts: tp.List[int]) -> None:
+    """
+    Every character whose index is `i` modulo the keyword length is shifted by the same
+    keyword letter, so such a slice is translated in one go and put back into its places.
+    """
+    step = len(shifts)
+    for position, shift in enumerate(shifts):
+        result[position::step] = text[position::step].translate(tables[shift])
+
+
+def _apply_vigenere_numpy(data: tp.Union[bytes, bytearray], encrypt: bool, shifts: tp.List[int]) -> bytes:
+    """
+    Vectorized variant: the keyword shifts are tiled into a keystream as long as the data,
+    so every byte keeps the key position of its index, exactly as in the pure-Python path.
+    """
+    size = len(string.ascii_uppercase)
+    codes = np.frombuffer(data, dtype=np.uint8)
+    key = np.array(shifts if encrypt else [(size - shift) % size for shift in shifts], dtype=np.uint8)
+    keystream = np.tile(key, -(-codes.size // key.size))[: codes.size]
+    # Clearing bit 0x20 maps lowercase letters onto uppercase ones, so a single range check
+    # and a single modular addition serve both cases; the case bit is restored afterwards.
+    # All arithmetic wraps around in uint8: `min(x, x - 26)` is `x % 26` for x < 52,
+    # and multiplying the change by the 0/1 letter mask leaves other bytes untouched.
+    shifted = codes & np.uint8(0xDF)
+    shifted -= np.uint8(ord("A"))
+    letters = (shifted < size).view(np.uint8)
+    shifted += keystream
+    np.minimum(shifted, shifted - np.uint8(size), out=shifted)
+    shifted += np.uint8(ord("A"))
+    shifted |= codes & np.uint8(0x20)
+    shifted -= codes
+    shifted *= letters
+    shifted += codes
+    return shifted.tobytes()
+
+
+def _apply_vigenere(text: tp.AnyStr, encrypt: bool, shifts: tp.List[int], backend: str = "auto") -> tp.AnyStr:
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+    if isinstance(text, (bytes, bytearray)):
+        if np is not None and (backend == "numpy" or backend == "auto" and len(text) >= NUMPY_THRESHOLD):
+            return _apply_vigenere_numpy(text, encrypt, shifts)
+        buffer = bytearray(len(text))
+        _interleave(text, buffer, ENCRYPT_BYTE_TABLES if encrypt else DECRYPT_BYTE_TABLES, shifts)
+        return bytes(buffer)
+    if text.isascii():
+        return _apply_vigenere(text.encode("ascii"), encrypt, shifts, backend).decode("ascii")
+    result = [""] * len(text)
+    _interleave(text, result, ENCRYPT_TABLES if encrypt else DECRYPT_TABLES, shifts)
+    return "".join(result)
+
+
+def _vigenere_stream(stream: tp.IO[tp.AnyStr], encrypt: bool, keyword: str, chunk_size: int) -> tp.Iterator[tp.AnyStr]:
+    shifts = _keyword_shifts(keyword)
+    offset = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        # The keyword continues from where the previous chunk stopped.
+        yield _apply_vigenere(chunk, encrypt, shifts[offset:] + shifts[:offset])
+        offset = (offset + len(chunk)) % len(shifts)
+
+
+def encrypt_vigenere(plaintext: str, keyword: str, backend: str = "auto") -> str:
     """
     Encrypts plaintext using a Vigenere cipher.
+
+    `backend` is one of "auto", "python" or "numpy". Large ASCII inputs use NumPy when it is
+    installed ("auto"); without NumPy every backend falls back to the pure-Python path.
+    Throughput target: at least 50 MB/s on multi-megabyte ASCII inputs.
     >>> encrypt_vigenere("PYTHON", "A")
     'PYTHON'
     >>> encrypt_vigenere("python", "a")
@@ -8,40 +110,14 @@ def encrypt_vigenere(plaintext: str, keyword: str) -> str:
     >>> encrypt_vigenere("ATTACKATDAWN", "LEMON")
     'LXFOPVEFRNHR'
     """
-    ciphertext = ""
-
-    utf_A, utf_Z = 65, 90
-    utf_a, utf_z = 97, 122
-
-    keyword = keyword.upper()
-    keyword_length = len(keyword)
-    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-    encode = dict(zip(alphabet, range(26)))
-
-    for idx, syl in enumerate(plaintext):
-        shift = encode[keyword[idx % keyword_length]]
-        syl_utf = ord(syl)
-
-        if utf_A <= syl_utf <= utf_Z:
-            code = syl_utf + shift
-            if code > utf_Z:
-                code = utf_A + code % utf_Z - 1
-            syl = chr(code)
+    return _apply_vigenere(plaintext, True, _keyword_shifts(keyword), backend)
 
-        elif utf_a <= syl_utf <= utf_z:
-            code = syl_utf + shift
-            if code > utf_z:
-                code = utf_a + code % utf_z - 1
-            syl = chr(code)
 
-        ciphertext += syl
-
-    return ciphertext
-
-
-def decrypt_vigenere(ciphertext: str, keyword: str) -> str:
+def decrypt_vigenere(ciphertext: str, keyword: str, backend: str = "auto") -> str:
     """
     Decrypts a ciphertext using a Vigenere cipher.
+
+    Throughput target: at least 50 MB/s on multi-megabyte ASCII inputs.
     >>> decrypt_vigenere("PYTHON", "A")
     'PYTHON'
     >>> decrypt_vigenere("python", "a")
@@ -49,32 +125,105 @@ def decrypt_vigenere(ciphertext: str, keyword: str) -> str:
     >>> decrypt_vigenere("LXFOPVEFRNHR", "LEMON")
     'ATTACKATDAWN'
     """
-    plaintext = ""
+    return _apply_vigenere(ciphertext, False, _keyword_shifts(keyword), backend)
 
-    utf_A, utf_Z = 65, 90
-    utf_a, utf_z = 97, 122
 
-    keyword = keyword.upper()
-    keyword_length = len(keyword)
-    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-    encode = dict(zip(alphabet, range(26)))
+def encrypt_vigenere_stream(
+    stream: tp.IO[tp.AnyStr], keyword: str, chunk_size: int = CHUNK_SIZE
+) -> tp.Iterator[tp.AnyStr]:
+    """
+    Encrypts a text or binary file object chunk by chunk, carrying the keyword position across chunks.
+    For binary streams the keyword advances per byte, which matches `encrypt_vigenere` on ASCII data.
+    >>> import io
+    >>> "".join(encrypt_vigenere_stream(io.StringIO("ATTACKATDAWN"), "LEMON", chunk_size=5))
+    'LXFOPVEFRNHR'
+    """
+    return _vigenere_stream(stream, True, keyword, chunk_size)
 
-    for idx, syl in enumerate(ciphertext):
-        shift = encode[keyword[idx % keyword_length]]
-        syl_utf = ord(syl)
 
-        if utf_A <= syl_utf <= utf_Z:
-            code = syl_utf - shift
-            if code < utf_A:
-                code = utf_Z - utf_A % code + 1
-            syl = chr(code)
+def decrypt_vigenere_stream(
+    stream: tp.IO[tp.AnyStr], keyword: str, chunk_size: int = CHUNK_SIZE
+) -> tp.Iterator[tp.AnyStr]:
+    """
+    Decrypts a text or binary file object chunk by chunk.
+    >>> import io
+    >>> b"".join(decrypt_vigenere_stream(io.BytesIO(b"LXFOPVEFRNHR"), "LEMON", chunk_size=7))
+    b'ATTACKATDAWN'
+    """
+    return _vigenere_stream(stream, False, keyword, chunk_size)
 
-        elif utf_a <= syl_utf <= utf_z:
-            code = syl_utf - shift
-            if code < utf_a:
-                code = utf_z - utf_a % code + 1
-            syl = chr(code)
 
-        plaintext += syl
+def encrypt_vigenere_bytes(data: Buffer, keyword: str, backend: str = "auto") -> bytes:
+    """
+    Encrypts ASCII bytes using a Vigenere cipher without decoding them to `str`.
+    >>> encrypt_vigenere_bytes(b"ATTACKATDAWN", "LEMON")
+    b'LXFOPVEFRNHR'
+    """
+    data = data.tobytes() if isinstance(data, memoryview) else data
+    return bytes(_apply_vigenere(tp.cast(bytes, data), True, _keyword_shifts(keyword), backend))
 
-    return plaintext
+
+def decrypt_vigenere_bytes(data: Buffer, keyword: str, backend: str = "auto") -> bytes:
+    """
+    Decrypts ASCII bytes using a Vigenere cipher without decoding them to `str`.
+    >>> decrypt_vigenere_bytes(memoryview(b"LXFOPVEFRNHR"), "LEMON")
+    b'ATTACKATDAWN'
+    """
+    data = data.tobytes() if isinstance(data, memoryview) else data
+    return bytes(_apply_vigenere(tp.cast(bytes, data), False, _keyword_shifts(keyword), backend))
+
+
+def _vigenere_inplace(buffer: WritableBuffer, encrypt: bool, keyword: str, chunk_size: int) -> None:
+    shifts = _keyword_shifts(keyword)
+    with memoryview(buffer) as view:
+        for start in range(0, len(view), chunk_size):
+            offset = start % len(shifts)
+            chunk = view[start : start + chunk_size]
+            chunk[:] = _apply_vigenere(chunk.tobytes(), encrypt, shifts[offset:] + shifts[:offset])
+
+
+def encrypt_vigenere_inplace(buffer: WritableBuffer, keyword: str, chunk_size: int = CHUNK_SIZE) -> None:
+    """
+    Encrypts a writable buffer (bytearray, memoryview, mmap) in place, one chunk at a time.
+    >>> data = bytearray(b"ATTACKATDAWN")
+    >>> encrypt_vigenere_inplace(data, "LEMON", chunk_size=4)
+    >>> data
+    bytearray(b'LXFOPVEFRNHR')
+    """
+    _vigenere_inplace(buffer, True, keyword, chunk_size)
+
+
+def decrypt_vigenere_inplace(buffer: WritableBuffer, keyword: str, chunk_size: int = CHUNK_SIZE) -> None:
+    """
+    Decrypts a writable buffer (bytearray, memoryview, mmap) in place, one chunk at a time.
+    >>> data = bytearray(b"LXFOPVEFRNHR")
+    >>> decrypt_vigenere_inplace(data, "LEMON", chunk_size=4)
+    >>> data
+    bytearray(b'ATTACKATDAWN')
+    """
+    _vigenere_inplace(buffer, False, keyword, chunk_size)
+
+
+def encrypt_vigenere_mmap(path: tp.Union[str, os.PathLike], keyword: str) -> None:
+    """
+    Encrypts an ASCII file in place through a memory map, without reading it into a `str`.
+    """
+    map_file(path, lambda mapped: encrypt_vigenere_inplace(mapped, keyword))
+
+
+def decrypt_vigenere_mmap(path: tp.Union[str, os.PathLike], keyword: str) -> None:
+    """
+    Decrypts an ASCII file in place through a memory map, without reading it into a `str`.
+    """
+    map_file(path, lambda mapped: decrypt_vigenere_inplace(mapped, keyword))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vigenere cipher filter from stdin to stdout")
+    parser.add_argument("keyword", help="Cipher keyword", type=str)
+    parser.add_argument("-d", "--decrypt", dest="decrypt", help="Decrypt instead of encrypt", action="store_true")
+    args = parser.parse_args()
+    process = decrypt_vigenere_stream if args.decrypt else encrypt_vigenere_stream
+    for block in process(sys.stdin.buffer, args.keyword):
+        sys.stdout.buffer.write(block)
+    sys.stdout.buffer.flush()
@@ -0,0 +1,216 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+import typing as tp
+
+import sudoku
+import sudoku_batch
+
+# Доля пустых позиций в пазлах для замера масштабирования
+EMPTY_FRACTION = 0.5
+PUZZLE_FILES = ("puzzle1.txt", "puzzle2.txt", "puzzle3.txt", "hard_puzzles.txt")
+# Движки и стратегии перебора: имя конфигурации -> аргументы sudoku.solve
+CONFIGS: tp.Dict[str, tp.Dict[str, tp.Any]] = {
+    "backtracking-mrv": {"backend": "backtracking", "strategy": "mrv"},
+    "backtracking-first": {"backend": "backtracking", "strategy": "first"},
+    "dlx": {"backend": "dlx"},
+}
+DEFAULT_THRESHOLD = 0.2
+
+Results = tp.Dict[str, tp.Dict[str, tp.Any]]
+
+
+def read_puzzle_file(path: tp.Union[str, os.PathLike]) -> tp.List[bytes]:
+    """Пазлы из файла: либо одна сетка по строкам (как puzzle1.txt), либо по пазлу в строке
+    (как hard_puzzles.txt)
+    >>> len(read_puzzle_file('puzzle1.txt')), len(read_puzzle_file('hard_puzzles.txt'))
+    (1, 95)
+    """
+    lines = list(sudoku_batch.read_puzzles(path))
+    if all(len(line) == len(lines) for line in lines):
+        return [sudoku.to_compact("".join(lines))]
+    return [sudoku.to_compact(line) for line in lines]
+
+
+def measure_solve(puzzle: bytes, **kwargs: tp.Any) -> tp.Dict[str, tp.Any]:
+    """
+    Время решения, узлы перебора, откаты и пиковая память одного пазла. Память считается
+    отдельным запуском под tracemalloc, чтобы трассировка не попадала во время.
+    """
+    stats = sudoku.SolveStats()
+    start = time.perf_counter()
+    solution = sudoku.solve(puzzle, stats=stats, **kwargs)
+    seconds = time.perf_counter() - start
+    assert solution is not None and sudoku.check_solution(solution)
+    tracemalloc.start()
+    try:
+        sudoku.solve(puzzle, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "ms": seconds * 1000,
+        "nodes": stats.nodes,
+        "backtracks": stats.backtracks,
+        "guesses": stats.guesses,
+        "peak_kb": peak / 1024,
+    }
+
+
+def benchmark_solvers(
+    paths: tp.Iterable[str] = PUZZLE_FILES,
+    configs: tp.Iterable[str] = CONFIGS,
+    limit: tp.Optional[int] = None,
+) -> Results:
+    """Замеры по каждому пазлу, ключ - "конфигурация[файл:номер пазла]"; limit ограничивает число пазлов из файла"""
+    puzzles = {os.path.basename(path): read_puzzle_file(path)[:limit] for path in paths}
+    results: Results = {}
+    for config in configs:
+        kwargs = CONFIGS[config]
+        # Матрица точного покрытия строится один раз, это не входит во время решения
+        sudoku.solve(next(iter(puzzles.values()))[0], **kwargs)
+        for name, file_puzzles in puzzles.items():
+            for index, puzzle in enumerate(file_puzzles):
+                results[f"{config}[{name}:{index}]"] = measure_solve(puzzle, **kwargs)
+    return results
+
+
+def summarize(results: Results) -> Results:
+    """Итоги по каждой паре конфигурация и файл: сумма времени, узлов и откатов, худшая память
+    >>> summarize({"dlx[a.txt:0]": {"ms": 1.0, "nodes": 3, "backtracks": 1, "guesses": 2, "peak_kb": 5.0},
+    ...            "dlx[a.txt:1]": {"ms": 2.0, "nodes": 4, "backtracks": 0, "guesses": 1, "peak_kb": 4.0}})
+    {'dlx[a.txt]': {'puzzles': 2, 'ms': 3.0, 'nodes': 7, 'backtracks': 1, 'guesses': 3, 'peak_kb': 5.0}}
+    """
+    summary: Results = {}
+    for key, result in results.items():
+        group = key[: key.rindex(":")] + "]"
+        total = summary.setdefault(group, {"puzzles": 0, "ms": 0.0, "nodes": 0, "backtracks": 0, "guesses": 0})
+        total["puzzles"] += 1
+        for field in ("ms", "nodes", "backtracks", "guesses"):
+            total[field] += result[field]
+        total["peak_kb"] = max(total.get("peak_kb", 0.0), result["peak_kb"])
+    return summary
+
+
+def compare(summary: Results, baseline: Results, threshold: float = DEFAULT_THRESHOLD) -> tp.List[str]:
+    """
+    Итоги, которые медленнее базовых больше чем на threshold (долю).
+    >>> compare({"a": {"ms": 130.0}, "b": {"ms": 105.0}}, {"a": {"ms": 100.0}, "b": {"ms": 100.0}}, 0.2)
+    ['a']
+    """
+    return [
+        name
+        for name, result in summary.items()
+        if name in baseline and result["ms"] > baseline[name]["ms"] * (1 + threshold)
+    ]
+
+
+def report_solvers(summary: Results, baseline: tp.Optional[Results] = None) -> None:
+    print(f"{'benchmark':<36} {'puzzles':>7} {'time':>12} {'nodes':>10} {'backtracks':>10} {'peak':>10} {'change':>8}")
+    for name, result in summary.items():
+        line = (
+            f"{name:<36} {result['puzzles']:>7} {result['ms']:>9.1f} ms {result['nodes']:>10} "
+            f"{result['backtracks']:>10} {result['peak_kb']:>7.1f} KB"
+        )
+        if baseline and name in baseline:
+            line += f" {result['ms'] / baseline[name]['ms'] - 1:>+8.1%}"
+        print(line)
+
+
+def load_results(path: tp.Union[str, os.PathLike]) -> Results:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_results(results: Results, path: tp.Union[str, os.PathLike]) -> None:
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def scaling_puzzles(n: int, count: int, empty_fraction: float = EMPTY_FRACTION, seed: int = 21) -> tp.List[bytes]:
+    """Пазлы из квадратов n x n: случайные решения, из которых убрана доля empty_fraction позиций
+    >>> puzzles = scaling_puzzles(4, 2)
+    >>> len(puzzles), len(puzzles[0]), puzzles[0].count(b".")
+    (2, 256, 128)
+    """
+    rng = random.Random(seed)
+    size = n * n
+    puzzles = []
+    for _ in range(count):
+        line = bytearray(sudoku.to_compact(sudoku.random_solution(rng, n)))
+        for position in rng.sample(range(size * size), int(empty_fraction * size * size)):
+            line[position] = ord(".")
+        puzzles.append(bytes(line))
+    return puzzles
+
+
+def benchmark_scaling(
+    box_sizes: tp.Iterable[int],
+    backends: tp.Iterable[str] = sudoku.BACKENDS,
+    count: int = 3,
+    empty_fraction: float = EMPTY_FRACTION,
+) -> Results:
+    """Среднее и худшее время решения в миллисекундах для каждого размера сетки и движка"""
+    results: Results = {}
+    for n in box_sizes:
+        puzzles = scaling_puzzles(n, count, empty_fraction)
+        for backend in backends:
+            # Матрица точного покрытия строится один раз на размер, это не входит во время решения
+            sudoku.solve(puzzles[0], backend=backend)
+            times = []
+            for puzzle in puzzles:
+                start = time.perf_counter()
+                solution = sudoku.solve(puzzle, backend=backend)
+                times.append((time.perf_counter() - start) * 1000)
+                assert solution is not None and sudoku.check_solution(solution)
+            size = n * n
+            results[f"{backend}[{size}x{size}]"] = {
+                "mean": statistics.mean(times),
+                "max": max(times),
+                "unit": "ms",
+            }
+    return results
+
+
+def report(results: Results) -> None:
+    print(f"{'benchmark':<26} {'mean':>12} {'max':>12}")
+    for name, result in results.items():
+        print(f"{name:<26} {result['mean']:>9.2f} {result['unit']:<2} {result['max']:>9.2f} {result['unit']:<2}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sudoku solver benchmarks")
+    parser.add_argument("--files", nargs="*", default=list(PUZZLE_FILES), help="Puzzle files to solve")
+    parser.add_argument("--configs", nargs="*", choices=list(CONFIGS), default=list(CONFIGS))
+    parser.add_argument("--limit", type=int, default=None, help="Puzzles per file")
+    parser.add_argument("--baseline", help="JSON file with results to compare against", type=str)
+    parser.add_argument("--save", help="Write the per-puzzle results to this JSON file", type=str)
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown, e.g. 0.2 for 20%%"
+    )
+    parser.add_argument("--scaling", action="store_true", help="Measure solve time from 4x4 to 25x25 instead")
+    parser.add_argument("--box-sizes", dest="box_sizes", nargs="*", type=int, default=list(sudoku.BOX_SIZES))
+    parser.add_argument("--backends", nargs="*", choices=sudoku.BACKENDS, default=list(sudoku.BACKENDS))
+    parser.add_argument("--count", type=int, default=3, help="Puzzles per size")
+    parser.add_argument("--empty", type=float, default=EMPTY_FRACTION, help="Fraction of empty cells")
+    args = parser.parse_args()
+
+    if args.scaling:
+        report(benchmark_scaling(args.box_sizes, args.backends, args.count, args.empty))
+        sys.exit(0)
+    results = benchmark_solvers(args.files, args.configs, args.limit)
+    summary = summarize(results)
+    baseline = summarize(load_results(args.baseline)) if args.baseline else None
+    report_solvers(summary, baseline)
+    if args.save:
+        save_results(results, args.save)
+    if baseline:
+        regressions = compare(summary, baseline, args.threshold)
+        if regressions:
+            print(f"Slower than the baseline by more than {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
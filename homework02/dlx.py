@@ -0,0 +1,139 @@
+import typing as tp
+
+
+class DancingLinks:
+    """Точное покрытие алгоритмом X Кнута на танцующих ссылках
+
+    Узлы хранятся в параллельных списках left/right/up/down: узел 0 - корень,
+    узлы 1..columns - заголовки столбцов, дальше - единицы матрицы по строкам.
+    >>> matrix = DancingLinks(7, [[2, 4, 5], [0, 3, 6], [1, 2, 5], [0, 3], [1, 6], [3, 4, 6]])
+    >>> list(matrix.solutions())
+    [[3, 0, 4]]
+    """
+
+    def __init__(self, columns: int, rows: tp.Sequence[tp.Sequence[int]]) -> None:
+        self.columns = columns
+        size = columns + 1
+        self.left = [i - 1 for i in range(size)]
+        self.right = [i + 1 for i in range(size)]
+        self.left[0], self.right[columns] = columns, 0
+        self.up = list(range(size))
+        self.down = list(range(size))
+        self.column = list(range(size))
+        self.row = [-1] * size
+        self.count = [0] * size
+        self.first_node: tp.List[int] = []
+        # Статистика перебора: узлы, выбранные строки и снятые строки
+        self.nodes = self.tries = self.backtracks = 0
+        for row_id, row in enumerate(rows):
+            first = len(self.column)
+            self.first_node.append(first)
+            for k, col in enumerate(row):
+                node = len(self.column)
+                header = col + 1
+                self.column.append(header)
+                self.row.append(row_id)
+                self.up.append(self.up[header])
+                self.down.append(header)
+                self.down[self.up[header]] = node
+                self.up[header] = node
+                self.count[header] += 1
+                self.left.append(node - 1 if k else node + len(row) - 1)
+                self.right.append(node + 1 if k < len(row) - 1 else first)
+
+    def copy(self) -> "DancingLinks":
+        """Независимая копия матрицы: копировать списки быстрее, чем заново строить связи"""
+        other = DancingLinks.__new__(DancingLinks)
+        other.columns = self.columns
+        other.left, other.right, other.up, other.down = self.left[:], self.right[:], self.up[:], self.down[:]
+        other.column, other.row, other.count = self.column, self.row, self.count[:]
+        other.first_node = self.first_node
+        other.nodes = other.tries = other.backtracks = 0
+        return other
+
+    def cover(self, header: int) -> None:
+        left, right, up, down, column, count = self.left, self.right, self.up, self.down, self.column, self.count
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+        i = down[header]
+        while i != header:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                count[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self, header: int) -> None:
+        left, right, up, down, column, count = self.left, self.right, self.up, self.down, self.column, self.count
+        i = up[header]
+        while i != header:
+            j = left[i]
+            while j != i:
+                count[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[header]] = header
+        left[right[header]] = header
+
+    def select(self, row_id: int) -> bool:
+        """Заранее включить строку в решение (например, известную цифру судоку).
+        Возвращает False, если строка конфликтует с уже выбранными."""
+        node = self.first_node[row_id]
+        headers = [self.column[node]]
+        j = self.right[node]
+        while j != node:
+            headers.append(self.column[j])
+            j = self.right[j]
+        for header in headers:
+            if self.left[self.right[header]] != header:
+                return False
+        for header in headers:
+            self.cover(header)
+        return True
+
+    def solutions(self) -> tp.Iterator[tp.List[int]]:
+        """Перечислить все точные покрытия оставшейся матрицы (номера строк)"""
+        partial: tp.List[int] = []
+        yield from self._search(partial)
+
+    def _search(self, partial: tp.List[int]) -> tp.Iterator[tp.List[int]]:
+        self.nodes += 1
+        right, down, count = self.right, self.down, self.count
+        if right[0] == 0:
+            yield list(partial)
+            return
+
+        # Столбец с наименьшим числом единиц - аналог выбора самой ограниченной позиции
+        header, best = 0, len(self.column)
+        j = right[0]
+        while j != 0:
+            if count[j] < best:
+                header, best = j, count[j]
+                if best <= 1:
+                    break
+            j = right[j]
+        if best == 0:
+            return
+
+        self.cover(header)
+        i = down[header]
+        while i != header:
+            partial.append(self.row[i])
+            self.tries += 1
+            j = right[i]
+            while j != i:
+                self.cover(self.column[j])
+                j = right[j]
+            yield from self._search(partial)
+            j = self.left[i]
+            while j != i:
+                self.uncover(self.column[j])
+                j = self.left[j]
+            partial.pop()
+            self.backtracks += 1
+            i = down[i]
+        self.uncover(header)
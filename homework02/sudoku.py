@@ -1,33 +1,206 @@
+import collections
+import dataclasses
+import functools
+import itertools
+import math
 import pathlib
 import random
 import time
 import typing as tp
 
+import dlx
+
 T = tp.TypeVar("T")
+Grid = tp.List[tp.List[str]]
+# Компактная сетка: size * size байт (81 для 9x9) - цифры или b"." по строкам, как в однострочной записи пазла
+CompactGrid = tp.Union[bytes, bytearray]
+AnyGrid = tp.Union[Grid, bytes, bytearray]
+Cell = tp.Tuple[int, int, int]
+Placement = tp.Tuple[int, int, int, int]
+Unit = tp.Tuple[int, int, tp.List[Cell]]
+
+# Цифры сетки из квадратов n x n - первые n * n символов: 1-9 для 9x9, 1-9 и A-G для 16x16
+SYMBOLS = "123456789ABCDEFGHIJKLMNOP"
+BOX_SIZES = range(2, 6)
+STRATEGIES = ("mrv", "first")
+BACKENDS = ("backtracking", "dlx")
+
+
+class _BitCount:
+    """Количество единиц в маске с тем же доступом, что у таблицы: для 25 цифр таблица на 2**25 не нужна"""
+
+    def __getitem__(self, mask: int) -> int:
+        return mask.bit_count()
+
+
+@dataclasses.dataclass(frozen=True)
+class Layout:
+    """Размеры сетки из квадратов n x n: size = n * n строк, столбцов, квадратов и цифр
+
+    Бит i маски соответствует цифре digits[i]; установленный бит означает, что цифра ещё свободна.
+    """
 
+    n: int
+    size: int
+    digits: str
+    bits: tp.Dict[str, int]
+    all_values: int
+    # Количество свободных цифр в маске
+    popcount: tp.Union[tp.List[int], _BitCount]
+    # Все 3 * size групп: (0 - строка, 1 - столбец, 2 - квадрат; номер группы; её позиции)
+    units: tp.List[Unit]
 
-def read_sudoku(path: tp.Union[str, pathlib.Path]) -> tp.List[tp.List[str]]:
+
+@functools.lru_cache(maxsize=None)
+def get_layout(n: int) -> Layout:
+    """
+    >>> layout = get_layout(4)
+    >>> layout.size, layout.digits, layout.popcount[layout.all_values]
+    (16, '123456789ABCDEFG', 16)
+    """
+    if n not in BOX_SIZES:
+        raise ValueError(f"Unsupported box size {n}, expected one of {list(BOX_SIZES)}")
+    size = n * n
+    digits = SYMBOLS[:size]
+    all_values = (1 << size) - 1
+    popcount: tp.Union[tp.List[int], _BitCount] = (
+        [bin(mask).count("1") for mask in range(all_values + 1)] if size <= 16 else _BitCount()
+    )
+    units: tp.List[Unit] = []
+    for k in range(size):
+        units.append((0, k, [(k, j, k // n * n + j // n) for j in range(size)]))
+        units.append((1, k, [(i, k, i // n * n + k // n) for i in range(size)]))
+        top, left = k // n * n, k % n * n
+        units.append((2, k, [(i, j, k) for i in range(top, top + n) for j in range(left, left + n)]))
+    return Layout(n, size, digits, {digit: 1 << i for i, digit in enumerate(digits)}, all_values, popcount, units)
+
+
+def layout_of(grid: tp.Sequence[tp.Sequence[str]]) -> Layout:
+    """Размеры сетки по числу её строк"""
+    return get_layout(math.isqrt(len(grid)))
+
+
+# Постоянные классической сетки 9x9
+DIGITS = get_layout(3).digits
+ALL_VALUES = get_layout(3).all_values
+BITS = get_layout(3).bits
+POPCOUNT = tp.cast(tp.List[int], get_layout(3).popcount)
+UNITS = get_layout(3).units
+
+
+def _exact_cover_rows(n: int) -> tp.List[tp.Tuple[int, int, int, int]]:
+    """Строки матрицы точного покрытия: строка (i * size + j) * size + d ставит цифру d в позицию (i, j)
+    и покрывает четыре из 4 * size * size столбцов (324 для 9x9) - позицию, цифру в строке,
+    в столбце и в квадрате"""
+    size = n * n
+    cells = size * size
+    return [
+        (i * size + j, cells + i * size + d, 2 * cells + j * size + d, 3 * cells + (i // n * n + j // n) * size + d)
+        for i in range(size)
+        for j in range(size)
+        for d in range(size)
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def _exact_cover_matrix(n: int) -> dlx.DancingLinks:
+    """Копируется для каждого пазла вместо построения связей заново"""
+    return dlx.DancingLinks(4 * n**4, _exact_cover_rows(n))
+
+
+def read_sudoku(path: tp.Union[str, pathlib.Path], n: tp.Optional[int] = None) -> tp.List[tp.List[str]]:
     """Прочитать Судоку из указанного файла"""
     path = pathlib.Path(path)
     with path.open() as f:
         puzzle = f.read()
-    return create_grid(puzzle)
+    return create_grid(puzzle, n)
+
+
+def create_grid(puzzle: str, n: tp.Optional[int] = None) -> tp.List[tp.List[str]]:
+    """Создать сетку судоку из квадратов n x n; символы, которые не цифры этой сетки и не ".",
+    пропускаются. Если n не задан, размеры пробуются от больших к меньшим, пока число позиций
+    не совпадёт с размером: так 9x9 читается только по "123456789.", как и раньше.
+    >>> len(create_grid('1234' + '.' * 12))
+    4
+    >>> create_grid('A' + '.' * 80)
+    Traceback (most recent call last):
+    ...
+    ValueError: 80 cells do not form a supported sudoku
+    """
+    layouts = [get_layout(n)] if n is not None else [get_layout(k) for k in reversed(BOX_SIZES)]
+    for layout in layouts:
+        digits = [c for c in puzzle if c in layout.digits or c == "."]
+        if len(digits) == layout.size * layout.size:
+            return group(digits, layout.size)
+    if n is not None:
+        raise ValueError(f"{len(digits)} cells do not form a {layout.size}x{layout.size} sudoku")
+    raise ValueError(f"{len(digits)} cells do not form a supported sudoku")
+
+
+def _compact_layout(line: str) -> Layout:
+    """Размеры сетки по однострочной записи пазла или ValueError, если это не пазл поддерживаемого размера
+    >>> _compact_layout('.' * 80)
+    Traceback (most recent call last):
+    ...
+    ValueError: 80 cells do not form a supported sudoku
+    """
+    n = math.isqrt(math.isqrt(len(line)))
+    if n**4 != len(line) or n not in BOX_SIZES:
+        raise ValueError(f"{len(line)} cells do not form a supported sudoku")
+    layout = get_layout(n)
+    unexpected = set(line).difference(layout.digits, ".")
+    if unexpected:
+        raise ValueError(f"Unexpected symbols {''.join(sorted(unexpected))!r} in a {layout.size}x{layout.size} sudoku")
+    return layout
+
+
+def to_compact(grid: tp.Union[Grid, str]) -> bytes:
+    """Перевести сетку или однострочную запись пазла в size * size байт
+
+    Пробельные символы в записи пропускаются; если остальное не пазл из квадратов
+    n x n для n от 2 до 5, возникает ValueError.
+    >>> to_compact(read_sudoku('puzzle1.txt'))[:18]
+    b'53..7....6..195...'
+    >>> from_compact(to_compact(read_sudoku('puzzle1.txt'))) == read_sudoku('puzzle1.txt')
+    True
+    >>> to_compact('0' * 81)
+    Traceback (most recent call last):
+    ...
+    ValueError: Unexpected symbols '0' in a 9x9 sudoku
+    """
+    if isinstance(grid, str):
+        line = "".join(grid.split())
+        _compact_layout(line)
+        return line.encode("ascii")
+    return "".join(map("".join, grid)).encode("ascii")
 
 
-def create_grid(puzzle: str) -> tp.List[tp.List[str]]:
-    """Создать сетку судоку"""
-    digits = [c for c in puzzle if c in "123456789."]
-    grid = group(digits, 9)
-    return grid
+def from_compact(data: CompactGrid) -> Grid:
+    """Перевести size * size байт в сетку из списков; ValueError, если байты не образуют пазл
+    >>> from_compact(b'123456789' * 9)[8]
+    ['1', '2', '3', '4', '5', '6', '7', '8', '9']
+    """
+    line = data.decode("ascii")
+    size = _compact_layout(line).size
+    return [list(line[i : i + size]) for i in range(0, size * size, size)]
 
 
-def display(grid: tp.List[tp.List[str]]) -> None:
+def display(grid: AnyGrid) -> None:
     """Вывод Судоку"""
+    if isinstance(grid, (bytes, bytearray)):
+        grid = from_compact(grid)
+    size = len(grid)
+    n = math.isqrt(size)
     width = 2
-    line = "+".join(["-" * (width * 3)] * 3)
-    for row in range(9):
-        print("".join(grid[row][col].center(width) + ("|" if str(col) in "25" else "") for col in range(9)))
-        if str(row) in "25":
+    line = "+".join(["-" * (width * n)] * n)
+    for row in range(size):
+        print(
+            "".join(
+                grid[row][col].center(width) + ("|" if col % n == n - 1 and col != size - 1 else "")
+                for col in range(size)
+            )
+        )
+        if row % n == n - 1 and row != size - 1:
             print(line)
     print()
 
@@ -77,9 +250,10 @@ def get_block(grid: tp.List[tp.List[str]], pos: tp.Tuple[int, int]) -> tp.List[s
     >>> get_block(grid, (8, 8))
     ['2', '8', '.', '.', '.', '5', '.', '7', '9']
     """
-    row = pos[0] // 3 * 3
-    col = pos[1] // 3 * 3
-    return [grid[i][j] for i in range(row, row + 3) for j in range(col, col + 3)]
+    n = math.isqrt(len(grid))
+    row = pos[0] // n * n
+    col = pos[1] // n * n
+    return [grid[i][j] for i in range(row, row + n) for j in range(col, col + n)]
 
 
 def find_empty_positions(
@@ -110,63 +284,621 @@ def find_possible_values(grid: tp.List[tp.List[str]], pos: tp.Tuple[int, int]) -
     >>> values == {'2', '5', '9'}
     True
     """
-    numbers = "123456789"
+    numbers = layout_of(grid).digits
     row = [s for s in get_row(grid, pos)]
     col = [s for s in get_col(grid, pos)]
     block = [s for s in get_block(grid, pos)]
     return set(numbers) - set(row + col + block)
 
 
-def solve(grid: tp.List[tp.List[str]]) -> tp.Optional[tp.List[tp.List[str]]]:
-    """Решение пазла, заданного в grid"""
+def free_masks(grid: tp.List[tp.List[str]]) -> tp.Tuple[tp.List[int], tp.List[int], tp.List[int]]:
+    """Вернуть маски свободных цифр для каждой строки, столбца и квадрата
+    >>> rows, cols, boxes = free_masks(read_sudoku('puzzle1.txt'))
+    >>> sorted(d for d in DIGITS if rows[0] & BITS[d])
+    ['1', '2', '4', '6', '8', '9']
+    >>> rows[0] & cols[2] & boxes[0] == BITS['1'] | BITS['2'] | BITS['4']
+    True
+    """
+    layout = layout_of(grid)
+    n, bits = layout.n, layout.bits
+    rows, cols, boxes = (
+        [layout.all_values] * layout.size,
+        [layout.all_values] * layout.size,
+        [layout.all_values] * layout.size,
+    )
+    for i, row in enumerate(grid):
+        for j, value in enumerate(row):
+            if value != ".":
+                bit = bits[value]
+                rows[i] &= ~bit
+                cols[j] &= ~bit
+                boxes[i // n * n + j // n] &= ~bit
+    return rows, cols, boxes
+
+
+@dataclasses.dataclass
+class SolveStats:
+    """Сколько позиций заполнило каждое правило распространения и сколько цифр поставлено перебором
+
+    nodes - число рассмотренных узлов дерева перебора, backtracks - число поставленных наугад
+    цифр (для dlx - выбранных строк матрицы), которые пришлось снять.
+    """
+
+    naked_singles: int = 0
+    hidden_singles: int = 0
+    guesses: int = 0
+    nodes: int = 0
+    backtracks: int = 0
+
+
+class SearchObserver:
+    """События перебора с возвратом: depth - число цифр, поставленных наугад выше узла,
+    position - (строка, столбец) позиции, которую перебирает узел. Методы по умолчанию
+    ничего не делают, наследник переопределяет нужные."""
+
+    def node_expanded(self, depth: int, position: tp.Tuple[int, int], candidates: int) -> None:
+        """Узел выбрал позицию с candidates возможными значениями и начинает их перебирать"""
+
+    def value_tried(self, depth: int, position: tp.Tuple[int, int], value: str) -> None:
+        """На позицию поставлено value, дальше перебор идёт на глубине depth + 1"""
+
+    def backtrack(self, depth: int, position: tp.Tuple[int, int], value: str) -> None:
+        """value на позиции не привело к решению и снято"""
+
+
+class SearchProfile(SearchObserver):
+    """Где перебор тратит время: число узлов по глубине и откатов по позициям
+    >>> profile = SearchProfile()
+    >>> solution = solve(to_compact(read_sudoku('puzzle2.txt')), observer=profile)
+    >>> sum(profile.nodes.values()), sum(profile.backtracks.values())
+    (1, 1)
+    """
+
+    def __init__(self) -> None:
+        self.nodes: tp.Counter[int] = collections.Counter()
+        self.backtracks: tp.Counter[tp.Tuple[int, int]] = collections.Counter()
+        self.max_depth = 0
+
+    def node_expanded(self, depth: int, position: tp.Tuple[int, int], candidates: int) -> None:
+        self.nodes[depth] += 1
+        self.max_depth = max(self.max_depth, depth)
+
+    def backtrack(self, depth: int, position: tp.Tuple[int, int], value: str) -> None:
+        self.backtracks[position] += 1
+
+
+@tp.overload
+def solve(
+    grid: Grid,
+    strategy: str = ...,
+    backend: str = ...,
+    propagate: bool = ...,
+    stats: tp.Optional[SolveStats] = ...,
+    observer: tp.Optional[SearchObserver] = ...,
+) -> tp.Optional[Grid]: ...
+
+
+@tp.overload
+def solve(
+    grid: bytearray,
+    strategy: str = ...,
+    backend: str = ...,
+    propagate: bool = ...,
+    stats: tp.Optional[SolveStats] = ...,
+    observer: tp.Optional[SearchObserver] = ...,
+) -> tp.Optional[bytearray]: ...
+
+
+@tp.overload
+def solve(
+    grid: bytes,
+    strategy: str = ...,
+    backend: str = ...,
+    propagate: bool = ...,
+    stats: tp.Optional[SolveStats] = ...,
+    observer: tp.Optional[SearchObserver] = ...,
+) -> tp.Optional[bytes]: ...
+
+
+def solve(
+    grid: AnyGrid,
+    strategy: str = "mrv",
+    backend: str = "backtracking",
+    propagate: bool = True,
+    stats: tp.Optional[SolveStats] = None,
+    observer: tp.Optional[SearchObserver] = None,
+) -> tp.Optional[AnyGrid]:
+    """Решение пазла, заданного в grid
+
+    backend "backtracking" - перебор с возвратом по битовым маскам, "dlx" - алгоритм X
+    с танцующими ссылками на матрице точного покрытия (324 столбца для 9x9; strategy для него
+    не используется: столбец всегда выбирается с наименьшим числом вариантов).
+    strategy задаёт порядок перебора позиций: "mrv" - позиция с наименьшим числом
+    возможных значений (перебор сразу прекращается, если у какой-то позиции их нет),
+    "first" - первая свободная позиция, как в find_empty_positions.
+    Сетки из квадратов n x n для n от 2 до 5 (от 4x4 до 25x25) решаются так же, как 9x9.
+    Компактная сетка (size * size байт) решается так же; bytearray заполняется на месте,
+    для bytes возвращается новая строка байтов.
+    Если propagate, то перед перебором и после каждой поставленной наугад цифры
+    до неподвижной точки применяются правила "единственный кандидат" и "единственное
+    место" (см. propagate); счётчики правил добавляются в stats.
+    observer (только для backtracking) получает события перебора, см. SearchObserver;
+    без него перебор не делает ничего лишнего, кроме проверки на None в узле.
+    >>> stats = SolveStats()
+    >>> solution = solve(read_sudoku('puzzle1.txt'), stats=stats)
+    >>> stats.guesses
+    0
+    >>> solve(to_compact(read_sudoku('puzzle1.txt')))[:9]
+    b'534678912'
+    """
     """ Как решать Судоку?
         1. Найти свободную позицию
         2. Найти все возможные значения, которые могут находиться на этой позиции
         3. Для каждого возможного значения:
             3.1. Поместить это значение на эту позицию
             3.2. Продолжить решать оставшуюся часть пазла
+    Свободные цифры строк, столбцов и квадратов хранятся в битовых масках, которые
+    обновляются при каждой постановке и снятии цифры, поэтому возможные значения
+    позиции - это пересечение трёх чисел.
     >>> grid = read_sudoku('puzzle1.txt')
     >>> solve(grid)
     [['5', '3', '4', '6', '7', '8', '9', '1', '2'], ['6', '7', '2', '1', '9', '5', '3', '4', '8'], ['1', '9', '8', '3', '4', '2', '5', '6', '7'], ['8', '5', '9', '7', '6', '1', '4', '2', '3'], ['4', '2', '6', '8', '5', '3', '7', '9', '1'], ['7', '1', '3', '9', '2', '4', '8', '5', '6'], ['9', '6', '1', '5', '3', '7', '2', '8', '4'], ['2', '8', '7', '4', '1', '9', '6', '3', '5'], ['3', '4', '5', '2', '8', '6', '1', '7', '9']]
     """
-    empty_position = find_empty_positions(grid)
-
-    if not empty_position:
+    if isinstance(grid, (bytes, bytearray)):
+        solution = solve(from_compact(grid), strategy, backend, propagate, stats, observer)
+        if solution is None:
+            return None
+        if isinstance(grid, bytes):
+            return to_compact(solution)
+        grid[:] = to_compact(solution)
         return grid
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy!r}, expected one of {STRATEGIES}")
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+    if stats is None:
+        stats = SolveStats()
+    if backend == "dlx":
+        if observer is not None:
+            raise ValueError("observer is only supported by the backtracking backend")
+        return _solve_dlx(grid, stats)
+    layout = layout_of(grid)
+    rows, cols, boxes = free_masks(grid)
+    empty_cells = _empty_cells(grid, layout.n)
+    if strategy == "first":
+        solved = _solve(grid, empty_cells, 0, rows, cols, boxes, layout, propagate, stats, observer)
+    else:
+        solved = _solve_mrv(grid, empty_cells, rows, cols, boxes, layout, propagate, stats, None, observer)
+    return grid if solved else None
+
+
+def _empty_cells(grid: Grid, n: int) -> tp.List[Cell]:
+    return [(i, j, i // n * n + j // n) for i, row in enumerate(grid) for j, value in enumerate(row) if value == "."]
+
+
+def _most_constrained(
+    grid: Grid,
+    empty_cells: tp.List[Cell],
+    rows: tp.List[int],
+    cols: tp.List[int],
+    boxes: tp.List[int],
+    layout: Layout,
+    start: int = 0,
+    first: bool = False,
+) -> tp.Tuple[int, int]:
+    """Номер в empty_cells (начиная со start) свободной позиции с наименьшим числом вариантов
+    и это число; (-1, size + 1), если свободных позиций нет. Позиции, заполненные распространением,
+    остаются в списке и пропускаются. Просмотр прерывается на позиции без вариантов (после позиции
+    с одним вариантом ищется тупик дальше по списку, выбранной же остаётся первая такая позиция),
+    а если first - на первой свободной позиции."""
+    popcount = layout.popcount
+    best, best_count = -1, layout.size + 1
+    cells = empty_cells[start:] if start else empty_cells
+    for k, (row, col, box) in enumerate(cells, start):
+        if grid[row][col] != ".":
+            continue
+        count = popcount[rows[row] & cols[col] & boxes[box]]
+        if count < best_count:
+            best, best_count = k, count
+            if count == 0 or first:
+                break
+    return best, best_count
+
+
+def _has_repeated_givens(
+    grid: Grid, layout: Layout, rows: tp.List[int], cols: tp.List[int], boxes: tp.List[int]
+) -> bool:
+    """Повторяется ли подсказка в строке, столбце или квадрате. free_masks повторов не замечает,
+    а перебор по маскам их не проверяет и на таком пазле обходил бы всё дерево."""
+    givens = sum(value != "." for row in grid for value in row)
+    return 3 * givens != sum(layout.size - layout.popcount[mask] for masks in (rows, cols, boxes) for mask in masks)
+
+
+def propagate(
+    grid: tp.List[tp.List[str]],
+    empty_cells: tp.List[Cell],
+    rows: tp.List[int],
+    cols: tp.List[int],
+    boxes: tp.List[int],
+    stats: SolveStats,
+) -> tp.Optional[tp.List[Placement]]:
+    """Заполнить все позиции, значение которых следует из правил, до неподвижной точки
+
+    "Единственный кандидат" (naked single): у позиции осталось одно возможное значение.
+    "Единственное место" (hidden single): цифру можно поставить только в одну позицию
+    строки, столбца или квадрата. Возвращает поставленные цифры (row, col, box, bit),
+    чтобы их можно было снять через undo, или None, если найдено противоречие
+    (тогда сетка и маски уже восстановлены).
+    >>> grid = read_sudoku('puzzle1.txt')
+    >>> rows, cols, boxes = free_masks(grid)
+    >>> empty_cells = [(i, j, i // 3 * 3 + j // 3) for i in range(9) for j in range(9) if grid[i][j] == '.']
+    >>> stats = SolveStats()
+    >>> placed = propagate(grid, empty_cells, rows, cols, boxes, stats)
+    >>> len(placed) == len(empty_cells) == stats.naked_singles + stats.hidden_singles
+    True
+    >>> check_solution(grid)
+    True
+    """
+    layout = layout_of(grid)
+    digits, popcount = layout.digits, layout.popcount
+    masks = (rows, cols, boxes)
+    placed: tp.List[Placement] = []
+    changed = True
+    while changed:
+        changed = False
+        for row, col, box in empty_cells:
+            if grid[row][col] != ".":
+                continue
+            values = rows[row] & cols[col] & boxes[box]
+            if not values:
+                undo(grid, placed, rows, cols, boxes)
+                return None
+            if not values & (values - 1):
+                _place(grid, row, col, box, values, rows, cols, boxes, digits, placed)
+                stats.naked_singles += 1
+                changed = True
+        if changed:
+            continue
+
+        for kind, index, unit in layout.units:
+            # once - цифры, возможные хотя бы в одной позиции группы, twice - хотя бы в двух
+            once = twice = empty = 0
+            for row, col, box in unit:
+                if grid[row][col] == ".":
+                    values = rows[row] & cols[col] & boxes[box]
+                    twice |= once & values
+                    once |= values
+                    empty += 1
+            free = masks[kind][index]
+            # В корректной сетке свободных цифр группы столько же, сколько пустых позиций,
+            # и каждой из них должно найтись место
+            if popcount[free] == empty and once != free:
+                undo(grid, placed, rows, cols, boxes)
+                return None
+            hidden = once & ~twice
+            if not hidden:
+                continue
+            for row, col, box in unit:
+                if grid[row][col] == ".":
+                    values = rows[row] & cols[col] & boxes[box] & hidden
+                    if values:
+                        _place(grid, row, col, box, values & -values, rows, cols, boxes, digits, placed)
+                        stats.hidden_singles += 1
+                        changed = True
+    return placed
+
+
+def _place(
+    grid: tp.List[tp.List[str]],
+    row: int,
+    col: int,
+    box: int,
+    bit: int,
+    rows: tp.List[int],
+    cols: tp.List[int],
+    boxes: tp.List[int],
+    digits: str,
+    placed: tp.List[Placement],
+) -> None:
+    grid[row][col] = digits[bit.bit_length() - 1]
+    rows[row] ^= bit
+    cols[col] ^= bit
+    boxes[box] ^= bit
+    placed.append((row, col, box, bit))
+
+
+def undo(
+    grid: tp.List[tp.List[str]],
+    placed: tp.List[Placement],
+    rows: tp.List[int],
+    cols: tp.List[int],
+    boxes: tp.List[int],
+) -> None:
+    """Снять цифры, поставленные propagate"""
+    for row, col, box, bit in placed:
+        grid[row][col] = "."
+        rows[row] |= bit
+        cols[col] |= bit
+        boxes[box] |= bit
 
-    row, col = empty_position
-    posible_values = find_possible_values(grid, empty_position)
 
-    if posible_values:
-        for opt in posible_values:
-            grid[row][col] = opt
-            if solve(grid):
-                return grid
-            grid[row][col] = "."
+def _solve(
+    grid: tp.List[tp.List[str]],
+    empty_cells: tp.List[Cell],
+    index: int,
+    rows: tp.List[int],
+    cols: tp.List[int],
+    boxes: tp.List[int],
+    layout: Layout,
+    propagate_: bool,
+    stats: SolveStats,
+    observer: tp.Optional[SearchObserver] = None,
+    depth: int = 0,
+) -> bool:
+    stats.nodes += 1
+    placed = propagate(grid, empty_cells, rows, cols, boxes, stats) if propagate_ else []
+    if placed is None:
+        return False
+    # Позиции, заполненные распространением, пропускаются
+    while index < len(empty_cells) and grid[empty_cells[index][0]][empty_cells[index][1]] != ".":
+        index += 1
+    if index == len(empty_cells):
+        return True
+
+    row, col, box = empty_cells[index]
+    posible_values = rows[row] & cols[col] & boxes[box]
+    digits = layout.digits
+
+    if observer is not None:
+        if _observed_branch(
+            grid,
+            (row, col, box),
+            rows,
+            cols,
+            boxes,
+            layout,
+            stats,
+            observer,
+            depth,
+            functools.partial(
+                _solve, grid, empty_cells, index + 1, rows, cols, boxes, layout, propagate_, stats, observer, depth + 1
+            ),
+        ):
+            return True
+        # Все значения уже перебраны, остаётся снять позицию
+        posible_values = 0
+
+    while posible_values:
+        bit = posible_values & -posible_values
+        posible_values ^= bit
+        grid[row][col] = digits[bit.bit_length() - 1]
+        stats.guesses += 1
+        rows[row] ^= bit
+        cols[col] ^= bit
+        boxes[box] ^= bit
+        if _solve(grid, empty_cells, index + 1, rows, cols, boxes, layout, propagate_, stats):
+            return True
+        stats.backtracks += 1
+        rows[row] |= bit
+        cols[col] |= bit
+        boxes[box] |= bit
+
+    grid[row][col] = "."
+    undo(grid, placed, rows, cols, boxes)
+    return False
+
+
+def _solve_mrv(
+    grid: tp.List[tp.List[str]],
+    empty_cells: tp.List[Cell],
+    rows: tp.List[int],
+    cols: tp.List[int],
+    boxes: tp.List[int],
+    layout: Layout,
+    propagate_: bool,
+    stats: SolveStats,
+    on_solution: tp.Optional[tp.Callable[[], bool]] = None,
+    observer: tp.Optional[SearchObserver] = None,
+    depth: int = 0,
+) -> bool:
+    """Перебор с выбором самой ограниченной позиции. Найдя решение, вызывает on_solution:
+    если оно вернуло False, перебор продолжается (так считаются решения), иначе решение
+    остаётся в grid."""
+    stats.nodes += 1
+    placed = propagate(grid, empty_cells, rows, cols, boxes, stats) if propagate_ else []
+    if placed is None:
+        return False
+
+    best, best_count = _most_constrained(grid, empty_cells, rows, cols, boxes, layout)
+    if best == -1:
+        if on_solution is None or on_solution():
+            return True
+        undo(grid, placed, rows, cols, boxes)
+        return False
+    if best_count == 0:
+        undo(grid, placed, rows, cols, boxes)
+        return False
+
+    # Выбранная позиция переставляется в конец списка и снимается с него на время перебора
+    empty_cells[best], empty_cells[-1] = empty_cells[-1], empty_cells[best]
+    row, col, box = empty_cells.pop()
+    posible_values = rows[row] & cols[col] & boxes[box]
+    digits = layout.digits
+
+    if observer is not None:
+        if _observed_branch(
+            grid,
+            (row, col, box),
+            rows,
+            cols,
+            boxes,
+            layout,
+            stats,
+            observer,
+            depth,
+            functools.partial(
+                _solve_mrv,
+                grid,
+                empty_cells,
+                rows,
+                cols,
+                boxes,
+                layout,
+                propagate_,
+                stats,
+                on_solution,
+                observer,
+                depth + 1,
+            ),
+        ):
+            return True
+        # Все значения уже перебраны, остаётся снять позицию
+        posible_values = 0
+
+    while posible_values:
+        bit = posible_values & -posible_values
+        posible_values ^= bit
+        grid[row][col] = digits[bit.bit_length() - 1]
+        stats.guesses += 1
+        rows[row] ^= bit
+        cols[col] ^= bit
+        boxes[box] ^= bit
+        if _solve_mrv(grid, empty_cells, rows, cols, boxes, layout, propagate_, stats, on_solution):
+            return True
+        stats.backtracks += 1
+        rows[row] |= bit
+        cols[col] |= bit
+        boxes[box] |= bit
+
+    grid[row][col] = "."
+    empty_cells.append((row, col, box))
+    empty_cells[best], empty_cells[-1] = empty_cells[-1], empty_cells[best]
+    undo(grid, placed, rows, cols, boxes)
+    return False
+
+
+def _observed_branch(
+    grid: tp.List[tp.List[str]],
+    cell: Cell,
+    rows: tp.List[int],
+    cols: tp.List[int],
+    boxes: tp.List[int],
+    layout: Layout,
+    stats: SolveStats,
+    observer: SearchObserver,
+    depth: int,
+    descend: tp.Callable[[], bool],
+) -> bool:
+    """Тот же перебор значений позиции, что в _solve и _solve_mrv, но с событиями для observer;
+    descend продолжает перебор на следующем уровне. Вынесен отдельно, чтобы перебор без
+    наблюдателя не проверял его на каждом значении."""
+    row, col, box = cell
+    posible_values = rows[row] & cols[col] & boxes[box]
+    observer.node_expanded(depth, (row, col), layout.popcount[posible_values])
+    while posible_values:
+        bit = posible_values & -posible_values
+        posible_values ^= bit
+        value = layout.digits[bit.bit_length() - 1]
+        grid[row][col] = value
+        stats.guesses += 1
+        observer.value_tried(depth, (row, col), value)
+        rows[row] ^= bit
+        cols[col] ^= bit
+        boxes[box] ^= bit
+        if descend():
+            return True
+        stats.backtracks += 1
+        observer.backtrack(depth, (row, col), value)
+        rows[row] |= bit
+        cols[col] |= bit
+        boxes[box] |= bit
+    return False
+
+
+def _exact_cover(grid: Grid) -> tp.Optional[dlx.DancingLinks]:
+    """Матрица точного покрытия с уже выбранными подсказками или None, если они противоречат друг другу"""
+    layout = layout_of(grid)
+    size, digits = layout.size, layout.digits
+    matrix = _exact_cover_matrix(layout.n).copy()
+    for i, row in enumerate(grid):
+        for j, value in enumerate(row):
+            if value != "." and not matrix.select((i * size + j) * size + digits.index(value)):
+                return None
+    return matrix
 
-    return None
+
+def _solve_dlx(grid: tp.List[tp.List[str]], stats: SolveStats) -> tp.Optional[tp.List[tp.List[str]]]:
+    """
+    >>> _solve_dlx(read_sudoku('puzzle1.txt'), SolveStats()) == solve(read_sudoku('puzzle1.txt'))
+    True
+    """
+    matrix = _exact_cover(grid)
+    if matrix is None:
+        return None
+    size, digits = len(grid), layout_of(grid).digits
+    solution = next(matrix.solutions(), None)
+    stats.nodes += matrix.nodes
+    stats.guesses += matrix.tries
+    stats.backtracks += matrix.backtracks
+    if solution is None:
+        return None
+    for row_id in solution:
+        position, d = divmod(row_id, size)
+        grid[position // size][position % size] = digits[d]
+    return grid
 
 
-def check_solution(solution: tp.List[tp.List[str]]) -> bool:
+def count_solutions(grid: tp.Union[AnyGrid, str], limit: int = 2, backend: str = "backtracking") -> int:
+    """Число решений пазла, но не больше limit
+
+    Перебор останавливается, как только найдено limit решений, поэтому для проверки
+    единственности хватает limit=2. Подсказки, противоречащие друг другу, дают 0.
+    backend "backtracking" (перебор с распространением) быстрее на обычных пазлах,
+    "dlx" - на самых трудных.
+    >>> count_solutions(read_sudoku('puzzle1.txt'))
+    1
+    >>> count_solutions('.' * 81, limit=10)
+    10
+    >>> count_solutions('11' + '.' * 79)
+    0
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+    if isinstance(grid, str):
+        grid = to_compact(grid)
+    if isinstance(grid, (bytes, bytearray)):
+        grid = from_compact(grid)
+    if limit <= 0:
+        return 0
+    if backend == "dlx":
+        matrix = _exact_cover(grid)
+        return 0 if matrix is None else sum(1 for _ in itertools.islice(matrix.solutions(), limit))
+    return _count_backtracking(grid, limit)
+
+
+def check_solution(solution: AnyGrid) -> bool:
     """Если решение solution верно, то вернуть True, в противном случае False"""
-    numbers = {"1", "2", "3", "4", "5", "6", "7", "8", "9"}
+    if isinstance(solution, (bytes, bytearray)):
+        solution = from_compact(solution)
+    layout = layout_of(solution)
+    numbers = set(layout.digits)
     for row in solution:
         if set(row) != numbers:
             return False
-    for c in range(9):
+    for c in range(layout.size):
         col = get_col(solution, (0, c))
         if set(col) != numbers:
             return False
-    for r in range(0, 9, 3):
-        for c in range(0, 9, 3):
+    for r in range(0, layout.size, layout.n):
+        for c in range(0, layout.size, layout.n):
             block = get_block(solution, (r, c))
             if set(block) != numbers:
                 return False
     return True
 
 
-def generate_sudoku(N: int) -> tp.List[tp.List[str]]:
-    """Генерация судоку заполненного на N элементов
+def generate_sudoku(N: int, n: int = 3) -> tp.List[tp.List[str]]:
+    """Генерация судоку из квадратов n x n, заполненного на N элементов
     >>> grid = generate_sudoku(40)
     >>> sum(1 for row in grid for e in row if e == '.')
     41
@@ -186,12 +918,11 @@ def generate_sudoku(N: int) -> tp.List[tp.List[str]]:
     >>> check_solution(solution)
     True
     """
-    grid = group(["." for _ in range(81)], 9)
-
-    solve(grid)
+    grid = random_solution(n=n)
+    size = len(grid)
 
-    empty_cells = 81 - N
-    positions = [(r, c) for r in range(9) for c in range(9)]
+    empty_cells = size * size - N
+    positions = [(r, c) for r in range(size) for c in range(size)]
     random.shuffle(positions)
     for row, col in positions[:empty_cells]:
         grid[row][col] = "."
@@ -199,6 +930,82 @@ def generate_sudoku(N: int) -> tp.List[tp.List[str]]:
     return grid
 
 
+def random_solution(rng: tp.Optional[random.Random] = None, n: int = 3) -> Grid:
+    """Случайная заполненная сетка. Квадраты на диагонали не пересекаются ни строками,
+    ни столбцами, поэтому заполняются независимыми случайными перестановками цифр,
+    а остальное достраивает solve. Для 4x4 такое начало не всегда достраивается,
+    тогда оно выбирается заново. Без rng используется общий генератор модуля random,
+    так что random.seed воспроизводит сетку.
+    >>> check_solution(random_solution(random.Random(1)))
+    True
+    >>> check_solution(random_solution(random.Random(1), n=4))
+    True
+    """
+    sample = rng.sample if rng is not None else random.sample
+    layout = get_layout(n)
+    while True:
+        grid = group(["." for _ in range(layout.size**2)], layout.size)
+        for box in range(n):
+            digits = sample(layout.digits, layout.size)
+            for k, digit in enumerate(digits):
+                grid[box * n + k // n][box * n + k % n] = digit
+        solution = solve(grid)
+        if solution is not None:
+            return solution
+
+
+def _count_backtracking(grid: Grid, limit: int) -> int:
+    grid = [row[:] for row in grid]
+    layout = layout_of(grid)
+    rows, cols, boxes = free_masks(grid)
+    if _has_repeated_givens(grid, layout, rows, cols, boxes):
+        return 0
+    empty_cells = _empty_cells(grid, layout.n)
+    found = 0
+
+    def on_solution() -> bool:
+        nonlocal found
+        found += 1
+        return found >= limit
+
+    _solve_mrv(grid, empty_cells, rows, cols, boxes, layout, True, SolveStats(), on_solution)
+    return found
+
+
+def generate_unique(min_nodes: int = 0, attempts: int = 20, rng: tp.Optional[random.Random] = None, n: int = 3) -> Grid:
+    """Генерация пазла с единственным решением
+
+    Из случайного решения в случайном порядке убираются подсказки, если после этого
+    решение остаётся единственным (подсчёт решений останавливается на втором), так что
+    ни одну оставшуюся подсказку убрать уже нельзя. Сложность пазла - число узлов
+    перебора в solve (SolveStats.nodes): делается до attempts попыток
+    получить пазл сложностью не меньше min_nodes, иначе возвращается самый сложный из них.
+    >>> grid = generate_unique(rng=random.Random(2))
+    >>> count_solutions(grid)
+    1
+    >>> check_solution(solve(grid))
+    True
+    """
+    rng = rng or random.Random()
+    hardest, hardest_nodes = None, -1
+    for _ in range(attempts):
+        puzzle = random_solution(rng, n)
+        size = len(puzzle)
+        for position in rng.sample(range(size * size), size * size):
+            row, col = divmod(position, size)
+            value, puzzle[row][col] = puzzle[row][col], "."
+            if _count_backtracking(puzzle, 2) != 1:
+                puzzle[row][col] = value
+        stats = SolveStats()
+        solve([row[:] for row in puzzle], stats=stats)
+        if stats.nodes > hardest_nodes:
+            hardest, hardest_nodes = puzzle, stats.nodes
+        if hardest_nodes >= min_nodes:
+            break
+    assert hardest is not None
+    return hardest
+
+
 if __name__ == "__main__":
     for filename in ("puzzle1.txt", "puzzle2.txt", "puzzle3.txt"):
         grid = read_sudoku(filename)
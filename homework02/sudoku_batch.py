@@ -0,0 +1,210 @@
+import argparse
+import collections
+import concurrent.futures
+import contextlib
+import dataclasses
+import itertools
+import math
+import os
+import random
+import sys
+import time
+import typing as tp
+
+import sudoku
+
+# Пазлов в одной задаче пула: решение занимает миллисекунды, и пересылка по одному съела бы выигрыш
+CHUNK_SIZE = 16
+# Сколько задач одновременно находится в пуле на каждый процесс
+IN_FLIGHT_PER_WORKER = 4
+
+
+@dataclasses.dataclass(frozen=True)
+class PuzzleResult:
+    index: int
+    puzzle: str
+    solution: tp.Optional[str]
+    seconds: float
+    # Почему строку не удалось прочитать как пазл; тогда solution - None
+    error: tp.Optional[str] = None
+
+
+def read_puzzles(path: tp.Union[str, os.PathLike]) -> tp.Iterator[str]:
+    """Читать файл с одним пазлом в строке (как hard_puzzles.txt), не загружая его целиком.
+    Пустые строки и строки, начинающиеся с #, пропускаются."""
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+
+
+def solve_puzzle(puzzle: str, backend: str = "backtracking") -> tp.Tuple[tp.Optional[str], float]:
+    """Решить пазл, записанный одной строкой, и вернуть решение той же строкой и время решения.
+    Если строка - не пазл (не то число позиций, посторонние символы, повторы среди подсказок),
+    возникает ValueError: перебор на пазле с повторами обходил бы всё дерево.
+    >>> solve_puzzle("4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......")[0]
+    '417369825632158947958724316825437169791586432346912758289643571573291684164875293'
+    """
+    compact = sudoku.to_compact(puzzle)
+    grid = sudoku.from_compact(compact)
+    if sudoku._has_repeated_givens(grid, sudoku.layout_of(grid), *sudoku.free_masks(grid)):
+        raise ValueError("Repeated givens in a row, column or box")
+    start = time.perf_counter()
+    solution = sudoku.solve(compact, backend=backend)
+    seconds = time.perf_counter() - start
+    return (solution.decode("ascii") if solution else None), seconds
+
+
+def _solve_chunk(puzzles: tp.List[str], backend: str) -> tp.List[tp.Tuple[tp.Optional[str], float, tp.Optional[str]]]:
+    """Ошибка в одной строке не должна прерывать весь поток, поэтому она возвращается вместо решения"""
+    results: tp.List[tp.Tuple[tp.Optional[str], float, tp.Optional[str]]] = []
+    for puzzle in puzzles:
+        try:
+            solution, seconds = solve_puzzle(puzzle, backend)
+        except ValueError as error:
+            results.append((None, 0.0, str(error)))
+        else:
+            results.append((solution, seconds, None))
+    return results
+
+
+def solve_stream(
+    puzzles: tp.Iterable[str],
+    backend: str = "backtracking",
+    max_workers: tp.Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    max_in_flight: tp.Optional[int] = None,
+) -> tp.Iterator[PuzzleResult]:
+    """
+    Решает пазлы в пуле процессов и выдаёт результаты в порядке входа по мере готовности.
+    Вход читается лениво: в пуле одновременно не больше max_in_flight задач по chunk_size
+    пазлов, поэтому память не зависит от длины файла. Строки, которые не удалось прочитать
+    как пазл, выдаются с заполненным error.
+    """
+    workers = max_workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * IN_FLIGHT_PER_WORKER
+    puzzles_iter = iter(puzzles)
+    chunks = iter(lambda: list(itertools.islice(puzzles_iter, chunk_size)), [])
+    index = 0
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        pending: tp.Deque[tp.Tuple[tp.List[str], concurrent.futures.Future]] = collections.deque()
+        for chunk in itertools.chain(chunks, [None]):
+            if chunk is not None:
+                pending.append((chunk, pool.submit(_solve_chunk, chunk, backend)))
+            # Ждём самую старую задачу, когда пул заполнен или вход закончился
+            while pending and (chunk is None or len(pending) >= max_in_flight):
+                done, future = pending.popleft()
+                for puzzle, (solution, seconds, error) in zip(done, future.result()):
+                    yield PuzzleResult(index, puzzle, solution, seconds, error)
+                    index += 1
+
+
+def percentile(values: tp.Sequence[float], q: float) -> float:
+    """Процентиль q (от 0 до 100) по методу ближайшего ранга
+    >>> percentile([5, 1, 4, 2, 3], 50)
+    3
+    >>> percentile(list(range(1, 101)), 95)
+    95
+    """
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+def summarize(
+    latencies: tp.Sequence[float], unsolved: int, wall_seconds: float, invalid: int = 0
+) -> tp.Dict[str, float]:
+    """Сводка по решённым и нерешаемым пазлам; invalid - строки, которые не удалось прочитать"""
+    if not latencies:
+        return {
+            "puzzles": 0,
+            "unsolved": unsolved,
+            "invalid": invalid,
+            "p50": 0.0,
+            "p95": 0.0,
+            "max": 0.0,
+            "puzzles_per_second": 0.0,
+        }
+    return {
+        "puzzles": len(latencies),
+        "unsolved": unsolved,
+        "invalid": invalid,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "max": max(latencies),
+        "puzzles_per_second": len(latencies) / wall_seconds if wall_seconds else 0.0,
+    }
+
+
+def run(
+    puzzles: tp.Iterable[str],
+    output: tp.TextIO,
+    backend: str = "backtracking",
+    max_workers: tp.Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    max_in_flight: tp.Optional[int] = None,
+) -> tp.Dict[str, float]:
+    """
+    Пишет в output строку "решение<TAB>время в мс" на каждый пазл сразу по готовности
+    (вместо решения - "unsolvable", для строки, которая не пазл, - "invalid<TAB>причина")
+    и возвращает сводку по задержкам и пропускной способности.
+    """
+    start = time.perf_counter()
+    latencies: tp.List[float] = []
+    unsolved = invalid = 0
+    for result in solve_stream(puzzles, backend, max_workers, chunk_size, max_in_flight):
+        if result.error is not None:
+            output.write(f"invalid\t{result.error}\n")
+            invalid += 1
+        else:
+            output.write(f"{result.solution or 'unsolvable'}\t{result.seconds * 1000:.3f}\n")
+            latencies.append(result.seconds)
+            unsolved += result.solution is None
+        output.flush()
+    return summarize(latencies, unsolved, time.perf_counter() - start, invalid)
+
+
+def _generate_chunk(seed: int, count: int, min_nodes: int) -> tp.List[str]:
+    rng = random.Random(seed)
+    return [sudoku.to_compact(sudoku.generate_unique(min_nodes, rng=rng)).decode("ascii") for _ in range(count)]
+
+
+def generate_many(
+    count: int,
+    min_nodes: int = 0,
+    seed: tp.Optional[int] = None,
+    max_workers: tp.Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> tp.List[str]:
+    """
+    Генерирует count пазлов с единственным решением (sudoku.generate_unique) в пуле процессов,
+    по chunk_size пазлов на задачу, и возвращает их однострочной записью. Каждая задача получает
+    своё зерно из seed, так что при одинаковом seed результат не зависит от числа процессов.
+    """
+    rng = random.Random(seed)
+    sizes = [min(chunk_size, count - start) for start in range(0, count, chunk_size)]
+    seeds = [rng.getrandbits(64) for _ in sizes]
+    with concurrent.futures.ProcessPoolExecutor(max_workers) as pool:
+        chunks = pool.map(_generate_chunk, seeds, sizes, itertools.repeat(min_nodes))
+        return list(itertools.chain.from_iterable(chunks))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve a file of sudoku puzzles, one per line, in parallel")
+    parser.add_argument("path", help="File with one 81-character puzzle per line")
+    parser.add_argument("-o", "--output", help="Where to write the solutions (default: stdout)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes")
+    parser.add_argument("--chunk-size", dest="chunk_size", type=int, default=CHUNK_SIZE, help="Puzzles per task")
+    parser.add_argument("--in-flight", dest="in_flight", type=int, default=None, help="Tasks queued at once")
+    parser.add_argument("--backend", choices=sudoku.BACKENDS, default="backtracking")
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        output = stack.enter_context(open(args.output, "w")) if args.output else sys.stdout
+        summary = run(read_puzzles(args.path), output, args.backend, args.jobs, args.chunk_size, args.in_flight)
+    print(
+        f"{summary['puzzles']} puzzles ({summary['unsolved']} unsolved, {summary['invalid']} invalid), "
+        f"p50 {summary['p50'] * 1000:.1f} ms, p95 {summary['p95'] * 1000:.1f} ms, "
+        f"max {summary['max'] * 1000:.1f} ms, {summary['puzzles_per_second']:.1f} puzzles/s",
+        file=sys.stderr,
+    )
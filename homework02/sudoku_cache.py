@@ -0,0 +1,252 @@
+import collections
+import dataclasses
+import functools
+import itertools
+import math
+import os
+import tempfile
+import typing as tp
+
+import sudoku
+
+# Больше вариантов порядка строк и столбцов канонизация не перебирает: такие пазлы не кэшируются
+MAX_CANDIDATES = 512
+MAXSIZE = 100_000
+UNSOLVABLE = "-"
+
+
+@dataclasses.dataclass(frozen=True)
+class Transform:
+    """Преобразование пазла в каноническую форму
+
+    Позиция (r, c) канонической сетки берётся из строки rows[r] и столбца cols[c] исходной
+    сетки (транспонированной, если transpose), а цифра заменяется по labels.
+    """
+
+    transpose: bool
+    rows: tp.Tuple[int, ...]
+    cols: tp.Tuple[int, ...]
+    labels: tp.Dict[str, str]
+
+    def apply(self, line: str) -> str:
+        size = len(self.rows)
+        labels = {**self.labels, ".": "."}
+        if self.transpose:
+            return "".join(labels[line[self.cols[c] * size + self.rows[r]]] for r in range(size) for c in range(size))
+        return "".join(labels[line[self.rows[r] * size + self.cols[c]]] for r in range(size) for c in range(size))
+
+    def invert(self, line: str) -> str:
+        """Вернуть каноническую сетку (например, решение) в исходную ориентацию и цифры"""
+        size = len(self.rows)
+        original = {label: digit for digit, label in self.labels.items()}
+        original["."] = "."
+        cells = [""] * (size * size)
+        for r in range(size):
+            for c in range(size):
+                row, col = self.rows[r], self.cols[c]
+                if self.transpose:
+                    row, col = col, row
+                cells[row * size + col] = original[line[r * size + c]]
+        return "".join(cells)
+
+
+def _transpose(line: str, size: int) -> str:
+    return "".join(line[c * size + r] for r in range(size) for c in range(size))
+
+
+@dataclasses.dataclass(frozen=True)
+class _Orders:
+    """Порядки строк (или столбцов), которые не различаются никакими инвариантами"""
+
+    key: tp.Tuple[tp.Any, ...]
+    count: int
+    bands: tp.List[tp.List[int]]
+    band_keys: tp.List[tp.Any]
+    keys: tp.List[tp.Any]
+
+    def orders(self) -> tp.Iterator[tp.List[int]]:
+        inside = [_tied_permutations(band, self.keys) for band in self.bands]
+        for band_order in _tied_permutations(list(range(len(self.bands))), self.band_keys):
+            for rows in itertools.product(*(inside[band] for band in band_order)):
+                yield [i for part in rows for i in part]
+
+
+def _orders(keys: tp.List[tp.Any], n: int) -> _Orders:
+    """Группы строк (и строки внутри группы) сортируются по ключам, а при равенстве
+    ключей перебираются все перестановки"""
+    bands = [list(range(band * n, band * n + n)) for band in range(n)]
+    band_keys = [tuple(sorted(keys[i] for i in band)) for band in bands]
+    count = _tied_count(range(n), band_keys) * math.prod(_tied_count(band, keys) for band in bands)
+    return _Orders(tuple(sorted(band_keys)), count, bands, band_keys, keys)
+
+
+def _orderings(line: str, n: int) -> tp.Tuple[_Orders, _Orders]:
+    """
+    Порядки строк и столбцов по числу подсказок в них и числу подсказок в столбцах (строках),
+    где они стоят. Эти ключи не зависят от перестановок и замены цифр.
+    """
+    size = n * n
+    row_counts = [sum(line[r * size + c] != "." for c in range(size)) for r in range(size)]
+    col_counts = [sum(line[r * size + c] != "." for r in range(size)) for c in range(size)]
+    row_keys = [
+        (row_counts[r], tuple(sorted(col_counts[c] for c in range(size) if line[r * size + c] != ".")))
+        for r in range(size)
+    ]
+    col_keys = [
+        (col_counts[c], tuple(sorted(row_counts[r] for r in range(size) if line[r * size + c] != ".")))
+        for c in range(size)
+    ]
+    return _orders(row_keys, n), _orders(col_keys, n)
+
+
+def _tied_count(items: tp.Iterable[int], keys: tp.Sequence[tp.Any]) -> int:
+    return math.prod(math.factorial(group) for group in collections.Counter(keys[i] for i in items).values())
+
+
+def _tied_permutations(items: tp.List[int], keys: tp.Sequence[tp.Any]) -> tp.List[tp.List[int]]:
+    """Все порядки items, отсортированные по keys, где элементы с равными ключами переставляются
+    >>> _tied_permutations([0, 1, 2], [5, 3, 5])
+    [[1, 0, 2], [1, 2, 0]]
+    """
+    groups = [list(group) for _, group in itertools.groupby(sorted(items, key=lambda i: keys[i]), lambda i: keys[i])]
+    return [[i for part in parts for i in part] for parts in itertools.product(*map(itertools.permutations, groups))]
+
+
+def _relabel(cells: tp.Iterable[str], digits: str) -> tp.Tuple[str, tp.Dict[str, str]]:
+    """Переименовать цифры в порядке первого появления"""
+    labels: tp.Dict[str, str] = {}
+    out = []
+    for value in cells:
+        if value != ".":
+            if value not in labels:
+                labels[value] = digits[len(labels)]
+            value = labels[value]
+        out.append(value)
+    # Цифры, которых нет в пазле, взаимозаменяемы: им достаются оставшиеся метки по порядку
+    missing = [digit for digit in digits if digit not in labels]
+    for digit, label in zip(missing, digits[len(labels) :]):
+        labels[digit] = label
+    return "".join(out), labels
+
+
+@functools.lru_cache(maxsize=4096)
+def canonical_form(line: str, max_candidates: int = MAX_CANDIDATES) -> tp.Optional[tp.Tuple[str, Transform]]:
+    """Каноническая форма пазла, записанного одной строкой, и преобразование в неё
+
+    Пазлы, которые отличаются заменой цифр, транспонированием, перестановкой строк внутри
+    горизонтальной полосы, самих полос и так же для столбцов, получают одну и ту же
+    форму. Если вариантов порядка больше max_candidates, возвращается None.
+    >>> puzzle = sudoku.to_compact(sudoku.read_sudoku('puzzle1.txt')).decode()
+    >>> relabeled = puzzle.translate(str.maketrans('123456789', '912345678'))
+    >>> canonical_form(puzzle)[0] == canonical_form(_transpose(relabeled, 9))[0]
+    True
+    """
+    size = math.isqrt(len(line))
+    n = math.isqrt(size)
+    digits = sudoku.get_layout(n).digits
+    orientations = []
+    for transpose in (False, True):
+        oriented = _transpose(line, size) if transpose else line
+        rows, cols = _orderings(oriented, n)
+        orientations.append(((rows.key, cols.key), transpose, oriented, rows, cols))
+    best_key = min(orientation[0] for orientation in orientations)
+    orientations = [orientation for orientation in orientations if orientation[0] == best_key]
+    if sum(rows.count * cols.count for _, _, _, rows, cols in orientations) > max_candidates:
+        return None
+
+    best: tp.Optional[tp.Tuple[str, Transform]] = None
+    for _, transpose, oriented, rows, cols in orientations:
+        col_orders = list(cols.orders())
+        for row_order in rows.orders():
+            for col_order in col_orders:
+                form, labels = _relabel((oriented[r * size + c] for r in row_order for c in col_order), digits)
+                if best is None or form < best[0]:
+                    best = form, Transform(transpose, tuple(row_order), tuple(col_order), labels)
+    return best
+
+
+class SolutionCache:
+    """
+    LRU-кэш решений перед sudoku.solve, ключ - каноническая форма пазла. Повторный пазл,
+    даже с другими цифрами или в другой ориентации, решается переводом сохранённого решения
+    обратно, без перебора. Если задан path, кэш читается из файла при создании и пишется
+    в него методом save.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = MAXSIZE,
+        path: tp.Optional[tp.Union[str, os.PathLike]] = None,
+        max_candidates: int = MAX_CANDIDATES,
+    ) -> None:
+        self.maxsize = maxsize
+        self.path = path
+        self.max_candidates = max_candidates
+        self.hits = self.misses = 0
+        self._solutions: tp.OrderedDict[str, str] = collections.OrderedDict()
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self) -> int:
+        return len(self._solutions)
+
+    def solve_line(self, line: str, **kwargs: tp.Any) -> tp.Optional[str]:
+        """Решить пазл, записанный одной строкой; kwargs передаются в sudoku.solve"""
+        canonical = canonical_form(line, self.max_candidates)
+        if canonical is None:
+            self.misses += 1
+            solution = sudoku.solve(line.encode("ascii"), **kwargs)
+            return solution.decode("ascii") if solution else None
+        form, transform = canonical
+        cached = self._solutions.get(form)
+        if cached is not None:
+            self.hits += 1
+            self._solutions.move_to_end(form)
+        else:
+            self.misses += 1
+            solution = sudoku.solve(form.encode("ascii"), **kwargs)
+            cached = solution.decode("ascii") if solution else UNSOLVABLE
+            self._solutions[form] = cached
+            if len(self._solutions) > self.maxsize:
+                self._solutions.popitem(last=False)
+        return None if cached == UNSOLVABLE else transform.invert(cached)
+
+    def solve(self, grid: sudoku.AnyGrid, **kwargs: tp.Any) -> tp.Optional[sudoku.AnyGrid]:
+        """Как sudoku.solve: сетка из списков и bytearray заполняются на месте, для bytes возвращается новая строка"""
+        line = grid.decode("ascii") if isinstance(grid, (bytes, bytearray)) else "".join(map("".join, grid))
+        solution = self.solve_line(line, **kwargs)
+        if solution is None:
+            return None
+        if isinstance(grid, bytes):
+            return solution.encode("ascii")
+        if isinstance(grid, bytearray):
+            grid[:] = solution.encode("ascii")
+            return grid
+        size = len(grid)
+        for row in range(size):
+            grid[row][:] = solution[row * size : (row + 1) * size]
+        return grid
+
+    def load(self, path: tp.Union[str, os.PathLike]) -> None:
+        with open(path) as f:
+            for line in f:
+                form, solution = line.split()
+                self._solutions[form] = solution
+        while len(self._solutions) > self.maxsize:
+            self._solutions.popitem(last=False)
+
+    def save(self, path: tp.Optional[tp.Union[str, os.PathLike]] = None) -> None:
+        """Записать кэш от старых записей к новым; файл заменяется целиком только после записи"""
+        path = path if path is not None else self.path
+        if path is None:
+            raise ValueError("No path to save the cache to")
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, name = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                for form, solution in self._solutions.items():
+                    f.write(f"{form} {solution}\n")
+            os.replace(name, path)
+        except BaseException:
+            os.unlink(name)
+            raise
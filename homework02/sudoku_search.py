@@ -0,0 +1,187 @@
+import asyncio
+import dataclasses
+import time
+import typing as tp
+
+import sudoku
+
+SOLVED = "solved"
+UNSOLVABLE = "unsolvable"
+GAVE_UP = "gave_up"
+# Сколько секунд solve_async перебирает, прежде чем отдать управление циклу событий
+SLICE_SECONDS = 0.005
+
+
+@dataclasses.dataclass(frozen=True)
+class SearchResult:
+    status: str
+    solution: tp.Optional[sudoku.AnyGrid]
+    nodes: int
+
+
+@dataclasses.dataclass
+class _Frame:
+    """Узел перебора: позиция, её ещё не испробованные значения, стоящее сейчас значение
+    и цифры, поставленные распространением при входе в узел"""
+
+    row: int
+    col: int
+    box: int
+    values: int
+    placed: tp.List[sudoku.Placement]
+    start: int
+    bit: int = 0
+
+
+class Search:
+    """
+    Перебор с возвратом, как в sudoku.solve, но на явном стеке вместо рекурсии. run
+    останавливается по исчерпании бюджета узлов или по сроку и возвращает GAVE_UP, не
+    теряя состояния: следующий вызов run продолжает перебор с того же места. Исходная
+    сетка не меняется, решение возвращается в том же виде, в каком задан пазл (для bytearray -
+    новый bytearray).
+    >>> search = Search(sudoku.read_sudoku('puzzle3.txt'))
+    >>> search.run(max_nodes=1).status
+    'gave_up'
+    >>> result = search.run()
+    >>> result.status, sudoku.check_solution(result.solution)
+    ('solved', True)
+    """
+
+    def __init__(self, grid: sudoku.AnyGrid, strategy: str = "mrv", propagate: bool = True) -> None:
+        if strategy not in sudoku.STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy!r}, expected one of {sudoku.STRATEGIES}")
+        # Тип компактной записи пазла, в которой возвращается решение, или None для сетки
+        self.compact: tp.Optional[type] = type(grid) if isinstance(grid, (bytes, bytearray)) else None
+        self.grid = sudoku.from_compact(grid) if isinstance(grid, (bytes, bytearray)) else [row[:] for row in grid]
+        self.strategy = strategy
+        self.propagate = propagate
+        self.stats = sudoku.SolveStats()
+        self.layout = sudoku.layout_of(self.grid)
+        self.rows, self.cols, self.boxes = sudoku.free_masks(self.grid)
+        self.empty_cells = sudoku._empty_cells(self.grid, self.layout.n)
+        self.stack: tp.List[_Frame] = []
+        self.result: tp.Optional[SearchResult] = None
+        # Следующим шагом нужно войти в новый узел (в начале - в корень)
+        self._descend = True
+        if sudoku._has_repeated_givens(self.grid, self.layout, self.rows, self.cols, self.boxes):
+            self.result = SearchResult(UNSOLVABLE, None, 0)
+
+    @property
+    def done(self) -> bool:
+        return self.result is not None
+
+    def run(self, max_nodes: tp.Optional[int] = None, deadline: tp.Optional[float] = None) -> SearchResult:
+        """Продолжить перебор, рассмотрев не больше max_nodes новых узлов и не позже deadline
+        (по time.monotonic)"""
+        if self.result is not None:
+            return self.result
+        last_node = None if max_nodes is None else self.stats.nodes + max_nodes
+        grid, rows, cols, boxes, stats, stack = self.grid, self.rows, self.cols, self.boxes, self.stats, self.stack
+        digits = self.layout.digits
+        while True:
+            if self._descend:
+                if (last_node is not None and stats.nodes >= last_node) or (
+                    deadline is not None and time.monotonic() >= deadline
+                ):
+                    return SearchResult(GAVE_UP, None, stats.nodes)
+                self._descend = False
+                if self._expand():
+                    return self._finish(SOLVED)
+            if not stack:
+                return self._finish(UNSOLVABLE)
+
+            frame = stack[-1]
+            row, col, box = frame.row, frame.col, frame.box
+            if frame.bit:
+                # Значение не привело к решению
+                stats.backtracks += 1
+                rows[row] |= frame.bit
+                cols[col] |= frame.bit
+                boxes[box] |= frame.bit
+                frame.bit = 0
+            if frame.values:
+                bit = frame.values & -frame.values
+                frame.values ^= bit
+                frame.bit = bit
+                grid[row][col] = digits[bit.bit_length() - 1]
+                stats.guesses += 1
+                rows[row] ^= bit
+                cols[col] ^= bit
+                boxes[box] ^= bit
+                self._descend = True
+            else:
+                grid[row][col] = "."
+                sudoku.undo(grid, frame.placed, rows, cols, boxes)
+                stack.pop()
+
+    def _expand(self) -> bool:
+        """Войти в узел: распространить следствия и выбрать позицию для перебора.
+        Возвращает True, если сетка решена; в тупике узел сразу снимается."""
+        grid, rows, cols, boxes, empty_cells = self.grid, self.rows, self.cols, self.boxes, self.empty_cells
+        self.stats.nodes += 1
+        placed = sudoku.propagate(grid, empty_cells, rows, cols, boxes, self.stats) if self.propagate else []
+        if placed is None:
+            return False
+
+        # Позиции, заполненные выше по стеку, остаются в списке и пропускаются
+        first = self.strategy == "first"
+        start = self.stack[-1].start if self.stack and first else 0
+        best, best_count = sudoku._most_constrained(grid, empty_cells, rows, cols, boxes, self.layout, start, first)
+        if best == -1:
+            return True
+        if best_count == 0:
+            sudoku.undo(grid, placed, rows, cols, boxes)
+            return False
+        row, col, box = empty_cells[best]
+        self.stack.append(_Frame(row, col, box, rows[row] & cols[col] & boxes[box], placed, best + 1))
+        return False
+
+    def _finish(self, status: str) -> SearchResult:
+        solution: tp.Optional[sudoku.AnyGrid] = None
+        if status == SOLVED:
+            solution = self.compact(sudoku.to_compact(self.grid)) if self.compact else [row[:] for row in self.grid]
+        self.result = SearchResult(status, solution, self.stats.nodes)
+        return self.result
+
+
+def solve_budgeted(
+    grid: sudoku.AnyGrid,
+    strategy: str = "mrv",
+    propagate: bool = True,
+    max_nodes: tp.Optional[int] = None,
+    timeout: tp.Optional[float] = None,
+) -> SearchResult:
+    """Решить пазл, сдавшись (GAVE_UP) после max_nodes узлов или timeout секунд
+    >>> solve_budgeted(sudoku.read_sudoku('puzzle1.txt'), max_nodes=10).status
+    'solved'
+    >>> solve_budgeted(b'.' * 81, strategy='first', propagate=False, max_nodes=10)
+    SearchResult(status='gave_up', solution=None, nodes=10)
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    return Search(grid, strategy, propagate).run(max_nodes, deadline)
+
+
+async def solve_async(
+    grid: sudoku.AnyGrid,
+    strategy: str = "mrv",
+    propagate: bool = True,
+    max_nodes: tp.Optional[int] = None,
+    timeout: tp.Optional[float] = None,
+    slice_seconds: float = SLICE_SECONDS,
+) -> SearchResult:
+    """
+    То же, что solve_budgeted, но перебор идёт отрезками по slice_seconds, между которыми
+    управление отдаётся циклу событий. Отмена задачи прерывает перебор между отрезками.
+    """
+    search = Search(grid, strategy, propagate)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        slice_end = time.monotonic() + slice_seconds
+        remaining = None if max_nodes is None else max_nodes - search.stats.nodes
+        result = search.run(remaining, slice_end if deadline is None else min(deadline, slice_end))
+        out_of_nodes = max_nodes is not None and search.stats.nodes >= max_nodes
+        out_of_time = deadline is not None and time.monotonic() >= deadline
+        if result.status != GAVE_UP or out_of_nodes or out_of_time:
+            return result
+        await asyncio.sleep(0)
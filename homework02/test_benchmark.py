@@ -0,0 +1,37 @@
+import unittest
+
+import benchmark
+import sudoku
+
+
+class BenchmarkTestCase(unittest.TestCase):
+    def test_scaling_puzzles(self):
+        puzzles = benchmark.scaling_puzzles(3, 2, empty_fraction=0.25)
+        self.assertEqual(puzzles, benchmark.scaling_puzzles(3, 2, empty_fraction=0.25))
+        for puzzle in puzzles:
+            self.assertEqual(20, puzzle.count(b"."))
+            self.assertTrue(sudoku.check_solution(sudoku.solve(puzzle)))
+
+    def test_benchmark_scaling(self):
+        results = benchmark.benchmark_scaling([2, 3], count=1)
+        self.assertEqual({"backtracking[4x4]", "dlx[4x4]", "backtracking[9x9]", "dlx[9x9]"}, set(results))
+        for result in results.values():
+            self.assertEqual("ms", result["unit"])
+            self.assertLessEqual(result["mean"], result["max"])
+
+    def test_read_puzzle_file(self):
+        (grid,) = benchmark.read_puzzle_file("puzzle1.txt")
+        self.assertEqual(sudoku.to_compact(sudoku.read_sudoku("puzzle1.txt")), grid)
+        self.assertEqual(95, len(benchmark.read_puzzle_file("hard_puzzles.txt")))
+
+    def test_benchmark_solvers(self):
+        results = benchmark.benchmark_solvers(["puzzle1.txt", "hard_puzzles.txt"], limit=2)
+        self.assertEqual(len(benchmark.CONFIGS) * 3, len(results))
+        self.assertIn("dlx[hard_puzzles.txt:1]", results)
+        for result in results.values():
+            self.assertGreaterEqual(result["nodes"], 1)
+            self.assertLessEqual(result["backtracks"], result["guesses"])
+            self.assertGreater(result["peak_kb"], 0)
+        summary = benchmark.summarize(results)
+        self.assertEqual(2, summary["backtracking-mrv[hard_puzzles.txt]"]["puzzles"])
+        self.assertEqual([], benchmark.compare(summary, summary))
@@ -1,3 +1,4 @@
+import random
 import unittest
 
 import sudoku
@@ -239,4 +240,194 @@ class SudokuTestCase(unittest.TestCase):
         self.assertEqual(expected_unknown, actual_unknown)
         solution = sudoku.solve(grid)
         solved = sudoku.check_solution(solution)
-        self.assertTrue(solved)
\ No newline at end of file
+        self.assertTrue(solved)
+
+    def test_solve_strategies(self):
+        puzzle = ".94...13..............76..2.8..1.....32.........2...6.....5.4.......8..7..63.4..8"
+        expected_solution = sudoku.solve(sudoku.create_grid(puzzle), strategy="first")
+        self.assertTrue(sudoku.check_solution(expected_solution))
+        actual_solution = sudoku.solve(sudoku.create_grid(puzzle), strategy="mrv")
+        self.assertEqual(expected_solution, actual_solution)
+
+        unsolvable = "12345678." + "........9" + "." * 63
+        for strategy in sudoku.STRATEGIES:
+            self.assertIsNone(sudoku.solve(sudoku.create_grid(unsolvable), strategy=strategy))
+
+        with self.assertRaises(ValueError):
+            sudoku.solve(sudoku.create_grid(puzzle), strategy="random")
+
+    def test_solve_mrv_dead_end(self):
+        # У первой пустой позиции один вариант, у последней - ни одного
+        stats = sudoku.SolveStats()
+        self.assertIsNone(sudoku.solve(sudoku.create_grid(".234" + "...2" + "...." + "341."), propagate=False, stats=stats))
+        self.assertEqual(1, stats.nodes)
+
+    def test_solve_backends(self):
+        for filename in ("puzzle1.txt", "puzzle2.txt", "puzzle3.txt"):
+            expected_solution = sudoku.solve(sudoku.read_sudoku(filename))
+            actual_solution = sudoku.solve(sudoku.read_sudoku(filename), backend="dlx")
+            self.assertEqual(expected_solution, actual_solution)
+
+        unsolvable = "12345678." + "........9" + "." * 63
+        self.assertIsNone(sudoku.solve(sudoku.create_grid(unsolvable), backend="dlx"))
+        conflicting = "11" + "." * 79
+        self.assertIsNone(sudoku.solve(sudoku.create_grid(conflicting), backend="dlx"))
+
+        with self.assertRaises(ValueError):
+            sudoku.solve(sudoku.create_grid(unsolvable), backend="z3")
+
+    def test_solve_propagation(self):
+        stats = sudoku.SolveStats()
+        solution = sudoku.solve(sudoku.read_sudoku("puzzle1.txt"), stats=stats)
+        self.assertTrue(sudoku.check_solution(solution))
+        self.assertEqual(0, stats.guesses)
+        self.assertEqual(51, stats.naked_singles + stats.hidden_singles)
+
+        puzzle = ".94...13..............76..2.8..1.....32.........2...6.....5.4.......8..7..63.4..8"
+        for strategy in sudoku.STRATEGIES:
+            with_propagation, without_propagation = sudoku.SolveStats(), sudoku.SolveStats()
+            expected_solution = sudoku.solve(
+                sudoku.create_grid(puzzle), strategy, propagate=False, stats=without_propagation
+            )
+            actual_solution = sudoku.solve(sudoku.create_grid(puzzle), strategy, stats=with_propagation)
+            self.assertEqual(expected_solution, actual_solution)
+            self.assertEqual(0, without_propagation.naked_singles + without_propagation.hidden_singles)
+            self.assertLess(with_propagation.guesses, without_propagation.guesses)
+
+    def test_compact_grid(self):
+        grid = sudoku.read_sudoku("puzzle1.txt")
+        compact = sudoku.to_compact(grid)
+        self.assertEqual(81, len(compact))
+        self.assertEqual(grid, sudoku.from_compact(compact))
+        self.assertEqual(compact, sudoku.to_compact(compact.decode()))
+
+        expected_solution = sudoku.to_compact(sudoku.solve(sudoku.read_sudoku("puzzle1.txt")))
+        self.assertEqual(expected_solution, sudoku.solve(compact))
+        mutable = bytearray(compact)
+        self.assertIs(mutable, sudoku.solve(mutable, backend="dlx"))
+        self.assertEqual(expected_solution, mutable)
+        self.assertTrue(sudoku.check_solution(mutable))
+        self.assertFalse(sudoku.check_solution(compact))
+        self.assertIsNone(sudoku.solve(b"12345678." + b"........9" + b"." * 63))
+
+        for malformed in (b"." * 80, b"." * 82, b"0" * 81, b"." * 80 + b"x"):
+            with self.assertRaises(ValueError):
+                sudoku.solve(malformed)
+            with self.assertRaises(ValueError):
+                sudoku.to_compact(malformed.decode())
+        self.assertEqual(compact, sudoku.to_compact(" ".join(compact.decode())))
+
+    def test_generate_sudoku_seed(self):
+        random.seed(5)
+        grid = sudoku.generate_sudoku(30)
+        random.seed(5)
+        self.assertEqual(grid, sudoku.generate_sudoku(30))
+
+    def test_generate_unique(self):
+        rng = random.Random(19)
+        solutions = {sudoku.to_compact(sudoku.random_solution(rng)) for _ in range(5)}
+        self.assertEqual(5, len(solutions))
+        self.assertTrue(all(sudoku.check_solution(solution) for solution in solutions))
+
+        grid = sudoku.generate_unique(min_nodes=3, attempts=50, rng=rng)
+        self.assertEqual(1, sudoku.count_solutions(grid))
+        stats = sudoku.SolveStats()
+        self.assertTrue(sudoku.check_solution(sudoku.solve(grid, stats=stats)))
+        self.assertGreaterEqual(stats.nodes, 3)
+
+        self.assertEqual(2, sudoku.count_solutions("." * 81))
+
+    def test_count_solutions(self):
+        unique = sudoku.read_sudoku("puzzle1.txt")
+        ambiguous = [row[:] for row in unique]
+        ambiguous[0][0] = ambiguous[0][1] = ambiguous[0][4] = "."
+        for backend in sudoku.BACKENDS:
+            with self.subTest(backend=backend):
+                self.assertEqual(1, sudoku.count_solutions(unique, backend=backend))
+                self.assertEqual(1, sudoku.count_solutions(sudoku.to_compact(unique), limit=5, backend=backend))
+                self.assertEqual(2, sudoku.count_solutions(ambiguous, backend=backend))
+                self.assertEqual(1, sudoku.count_solutions(ambiguous, limit=1, backend=backend))
+                self.assertEqual(100, sudoku.count_solutions("." * 81, limit=100, backend=backend))
+                self.assertEqual(0, sudoku.count_solutions("12345678." + "........9" + "." * 63, backend=backend))
+                self.assertEqual(0, sudoku.count_solutions("1" + "." * 8 + "1" + "." * 71, backend=backend))
+        self.assertEqual(".", unique[0][2])
+        with self.assertRaises(ValueError):
+            sudoku.count_solutions(unique, backend="sat")
+
+    def test_box_sizes(self):
+        puzzle = "1.3." + ".4.2" + "2.4." + ".3.1"
+        grid = sudoku.create_grid(puzzle)
+        self.assertEqual(4, len(grid))
+        self.assertEqual({"2"}, sudoku.find_possible_values(grid, (0, 1)))
+        self.assertEqual(["1", ".", ".", "4"], sudoku.get_block(grid, (1, 1)))
+        for backend in sudoku.BACKENDS:
+            solution = sudoku.solve(sudoku.create_grid(puzzle), backend=backend)
+            self.assertTrue(sudoku.check_solution(solution))
+            self.assertEqual(grid[0][0], solution[0][0])
+        self.assertFalse(sudoku.check_solution(sudoku.create_grid("1234" * 4)))
+
+        for n in (4, 5):
+            with self.subTest(n=n):
+                solution = sudoku.random_solution(random.Random(n), n)
+                size = n * n
+                self.assertEqual(size, len(solution))
+                self.assertTrue(sudoku.check_solution(solution))
+                puzzle = sudoku.to_compact(solution)
+                self.assertEqual(size * size, len(puzzle))
+                puzzle = puzzle[:size] + b"." * size + puzzle[2 * size :]
+                self.assertEqual(sudoku.to_compact(solution), sudoku.solve(puzzle))
+                self.assertEqual(1, sudoku.count_solutions(puzzle))
+
+        grid = sudoku.generate_sudoku(100, n=4)
+        self.assertEqual(156, sum(1 for row in grid for e in row if e == "."))
+        self.assertTrue(sudoku.check_solution(sudoku.solve(grid)))
+
+        with self.assertRaises(ValueError):
+            sudoku.create_grid("." * 80)
+        with self.assertRaises(ValueError):
+            sudoku.create_grid("A" + "." * 80)
+        compact = sudoku.to_compact(sudoku.read_sudoku("puzzle1.txt")).decode()
+        self.assertEqual(sudoku.read_sudoku("puzzle1.txt"), sudoku.create_grid("|".join(compact) + "\n--ABC--"))
+        self.assertEqual(9, len(sudoku.create_grid("A" + "." * 81)))
+        with self.assertRaises(ValueError):
+            sudoku.get_layout(6)
+
+    def test_search_observer(self):
+        class Recorder(sudoku.SearchObserver):
+            def __init__(self):
+                self.events = []
+
+            def node_expanded(self, depth, position, candidates):
+                self.events.append(("node", depth, position))
+
+            def value_tried(self, depth, position, value):
+                self.events.append(("try", depth, position))
+
+            def backtrack(self, depth, position, value):
+                self.events.append(("backtrack", depth, position))
+
+        puzzle = ".94...13..............76..2.8..1.....32.........2...6.....5.4.......8..7..63.4..8"
+        for strategy in sudoku.STRATEGIES:
+            recorder, stats = Recorder(), sudoku.SolveStats()
+            solution = sudoku.solve(sudoku.create_grid(puzzle), strategy, stats=stats, observer=recorder)
+            self.assertEqual(sudoku.solve(sudoku.create_grid(puzzle), strategy), solution)
+            kinds = [event[0] for event in recorder.events]
+            self.assertEqual(stats.guesses, kinds.count("try"))
+            self.assertEqual(stats.backtracks, kinds.count("backtrack"))
+            self.assertLessEqual(kinds.count("node"), stats.nodes)
+            # Каждое значение пробуется на глубине узла, который выбрал позицию
+            depth = 0
+            for kind, event_depth, _ in recorder.events:
+                if kind == "node":
+                    depth = event_depth
+                elif kind == "try":
+                    self.assertEqual(depth, event_depth)
+                    depth = event_depth + 1
+                else:
+                    depth = event_depth
+
+        profile, stats = sudoku.SearchProfile(), sudoku.SolveStats()
+        sudoku.solve(sudoku.create_grid(puzzle), stats=stats, observer=profile)
+        self.assertEqual(stats.backtracks, sum(profile.backtracks.values()))
+        with self.assertRaises(ValueError):
+            sudoku.solve(sudoku.create_grid(puzzle), backend="dlx", observer=profile)
@@ -0,0 +1,74 @@
+import io
+import pathlib
+import tempfile
+import unittest
+
+import sudoku
+import sudoku_batch
+
+
+class SudokuBatchTestCase(unittest.TestCase):
+    def test_read_puzzles(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = pathlib.Path(tmpdir) / "puzzles.txt"
+            path.write_text("# comment\n" + "." * 81 + "\n\n" + "1" + "." * 80 + "\n")
+            self.assertEqual(["." * 81, "1" + "." * 80], list(sudoku_batch.read_puzzles(path)))
+
+    def test_solve_stream(self):
+        puzzles = list(sudoku_batch.read_puzzles("hard_puzzles.txt"))[:20]
+        puzzles.append("12345678." + "........9" + "." * 63)
+        puzzles.append("11" + "." * 79)
+        results = list(sudoku_batch.solve_stream(puzzles, max_workers=2, chunk_size=3, max_in_flight=2))
+        self.assertEqual(list(range(len(puzzles))), [result.index for result in results])
+        self.assertEqual(puzzles, [result.puzzle for result in results])
+        for result in results[:-2]:
+            self.assertTrue(sudoku.check_solution(sudoku.create_grid(result.solution)))
+        self.assertIsNone(results[-2].solution)
+        self.assertIsNone(results[-1].solution)
+        self.assertEqual("Repeated givens in a row, column or box", results[-1].error)
+
+    def test_run(self):
+        puzzles = list(sudoku_batch.read_puzzles("hard_puzzles.txt"))[:10]
+        output = io.StringIO()
+        summary = sudoku_batch.run(puzzles, output, backend="dlx", max_workers=2, chunk_size=4)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(10, len(lines))
+        self.assertEqual(10, summary["puzzles"])
+        self.assertEqual(0, summary["unsolved"])
+        self.assertLessEqual(summary["p50"], summary["p95"])
+        self.assertLessEqual(summary["p95"], summary["max"])
+        self.assertGreater(summary["puzzles_per_second"], 0)
+        solution, milliseconds = lines[0].split("\t")
+        self.assertEqual(sudoku_batch.solve_puzzle(puzzles[0])[0], solution)
+        self.assertGreater(float(milliseconds), 0)
+
+    def test_invalid_lines(self):
+        puzzles = list(sudoku_batch.read_puzzles("hard_puzzles.txt"))[:3]
+        bad = ["." * 80, "0" * 81, "4....x8.5" + "." * 72]
+        mixed = [puzzles[0], bad[0], puzzles[1], bad[1], bad[2], puzzles[2]]
+        results = list(sudoku_batch.solve_stream(mixed, max_workers=2, chunk_size=2))
+        self.assertEqual(mixed, [result.puzzle for result in results])
+        for result in results:
+            if result.puzzle in bad:
+                self.assertIsNone(result.solution)
+                self.assertTrue(result.error)
+            else:
+                self.assertIsNone(result.error)
+                self.assertTrue(sudoku.check_solution(sudoku.create_grid(result.solution)))
+
+        output = io.StringIO()
+        summary = sudoku_batch.run(mixed, output, max_workers=2, chunk_size=2)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(6, len(lines))
+        self.assertEqual(3, summary["puzzles"])
+        self.assertEqual(0, summary["unsolved"])
+        self.assertEqual(3, summary["invalid"])
+        self.assertTrue(lines[1].startswith("invalid\t"))
+        self.assertEqual(sudoku_batch.solve_puzzle(puzzles[1])[0], lines[2].split("\t")[0])
+
+    def test_generate_many(self):
+        puzzles = sudoku_batch.generate_many(6, seed=7, max_workers=2, chunk_size=4)
+        self.assertEqual(6, len(puzzles))
+        self.assertEqual(puzzles, sudoku_batch.generate_many(6, seed=7, max_workers=1, chunk_size=4))
+        for puzzle in puzzles:
+            self.assertEqual(1, sudoku.count_solutions(puzzle))
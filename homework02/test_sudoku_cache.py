@@ -0,0 +1,70 @@
+import pathlib
+import random
+import tempfile
+import unittest
+
+import sudoku
+import sudoku_cache
+
+
+def shuffle_puzzle(line, rng, n=3):
+    """Переставить полосы, строки в них, столбцы, транспонировать и заменить цифры"""
+    size = n * n
+    rows = [band * n + r for band in rng.sample(range(n), n) for r in rng.sample(range(n), n)]
+    cols = [stack * n + c for stack in rng.sample(range(n), n) for c in rng.sample(range(n), n)]
+    digits = sudoku.get_layout(n).digits
+    labels = dict(zip(digits, rng.sample(digits, size)), **{".": "."})
+    line = "".join(labels[line[rows[r] * size + cols[c]]] for r in range(size) for c in range(size))
+    return sudoku_cache._transpose(line, size) if rng.random() < 0.5 else line
+
+
+class SudokuCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(22)
+        self.puzzles = list(open("hard_puzzles.txt").read().split())[:10]
+
+    def test_canonical_form(self):
+        for puzzle in self.puzzles:
+            form, transform = sudoku_cache.canonical_form(puzzle)
+            self.assertEqual(form, transform.apply(puzzle))
+            self.assertEqual(puzzle, transform.invert(form))
+            for _ in range(3):
+                self.assertEqual(form, sudoku_cache.canonical_form(shuffle_puzzle(puzzle, self.rng))[0])
+        self.assertIsNone(sudoku_cache.canonical_form("." * 81))
+
+    def test_solution_cache(self):
+        cache = sudoku_cache.SolutionCache()
+        for puzzle in self.puzzles:
+            self.assertEqual(sudoku.solve(puzzle.encode()).decode(), cache.solve_line(puzzle))
+        self.assertEqual((0, 10), (cache.hits, cache.misses))
+        for puzzle in self.puzzles:
+            shuffled = shuffle_puzzle(puzzle, self.rng)
+            self.assertEqual(sudoku.solve(shuffled.encode()).decode(), cache.solve_line(shuffled))
+        self.assertEqual((10, 10), (cache.hits, cache.misses))
+
+        grid = sudoku.create_grid(self.puzzles[0])
+        self.assertIs(grid, cache.solve(grid))
+        self.assertTrue(sudoku.check_solution(grid))
+        self.assertEqual(sudoku.to_compact(grid), cache.solve(self.puzzles[0].encode()))
+        unsolvable = "12345678." + "........9" + "." * 63
+        self.assertIsNone(cache.solve(unsolvable.encode()))
+        self.assertIsNone(cache.solve(unsolvable.encode()))
+        self.assertEqual(sudoku.solve(b"." * 81), cache.solve(b"." * 81))
+
+    def test_eviction_and_persistence(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = pathlib.Path(tmpdir) / "cache.txt"
+            cache = sudoku_cache.SolutionCache(maxsize=5, path=path)
+            for puzzle in self.puzzles:
+                cache.solve_line(puzzle)
+            self.assertEqual(5, len(cache))
+            cache.save()
+
+            restored = sudoku_cache.SolutionCache(maxsize=5, path=path)
+            self.assertEqual(5, len(restored))
+            for puzzle in self.puzzles[5:]:
+                restored.solve_line(shuffle_puzzle(puzzle, self.rng))
+            self.assertEqual((5, 0), (restored.hits, restored.misses))
+            restored.solve_line(self.puzzles[0])
+            self.assertEqual(1, restored.misses)
+            self.assertEqual([path], list(pathlib.Path(tmpdir).iterdir()))
@@ -0,0 +1,88 @@
+import asyncio
+import time
+import unittest
+
+import sudoku
+import sudoku_search
+
+
+class SudokuSearchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.puzzles = [line.encode("ascii") for line in open("hard_puzzles.txt").read().split()[:10]]
+
+    def test_search(self):
+        for strategy in sudoku.STRATEGIES:
+            for puzzle in self.puzzles:
+                result = sudoku_search.Search(puzzle, strategy).run()
+                self.assertEqual(sudoku_search.SOLVED, result.status)
+                self.assertEqual(sudoku.solve(puzzle, strategy), result.solution)
+
+        grid = sudoku.read_sudoku("puzzle2.txt")
+        result = sudoku_search.solve_budgeted(grid)
+        self.assertEqual(sudoku.solve(sudoku.read_sudoku("puzzle2.txt")), result.solution)
+        self.assertEqual(sudoku.read_sudoku("puzzle2.txt"), grid)
+
+        puzzle = bytearray(self.puzzles[0])
+        result = sudoku_search.solve_budgeted(puzzle)
+        self.assertIsInstance(result.solution, bytearray)
+        self.assertEqual(sudoku.solve(self.puzzles[0]), result.solution)
+        self.assertEqual(self.puzzles[0], puzzle)
+
+        result = sudoku_search.solve_budgeted(b"11" + b"." * 79)
+        self.assertEqual(sudoku_search.UNSOLVABLE, result.status)
+        self.assertIsNone(result.solution)
+
+    def test_budget_and_resume(self):
+        puzzle = self.puzzles[4]
+        expected = sudoku_search.Search(puzzle).run()
+        search = sudoku_search.Search(puzzle)
+        runs = 0
+        while not search.done:
+            result = search.run(max_nodes=5)
+            self.assertLessEqual(result.nodes, 5 * (runs + 1))
+            runs += 1
+        self.assertGreater(runs, 1)
+        self.assertEqual(expected, result)
+
+        result = sudoku_search.solve_budgeted(puzzle, max_nodes=3)
+        self.assertEqual(sudoku_search.SearchResult(sudoku_search.GAVE_UP, None, 3), result)
+        result = sudoku_search.solve_budgeted(puzzle, timeout=0)
+        self.assertEqual(sudoku_search.GAVE_UP, result.status)
+
+    def test_solve_async(self):
+        puzzle = self.puzzles[9]
+
+        async def solve_with_ticker():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0)
+                    ticks += 1
+
+            task = asyncio.create_task(ticker())
+            result = await sudoku_search.solve_async(puzzle, slice_seconds=0.0001)
+            task.cancel()
+            return result, ticks
+
+        result, ticks = asyncio.run(solve_with_ticker())
+        self.assertEqual(sudoku.solve(puzzle), result.solution)
+        self.assertGreater(ticks, 0)
+
+        result = asyncio.run(sudoku_search.solve_async(puzzle, max_nodes=7, slice_seconds=0.0001))
+        self.assertEqual(sudoku_search.SearchResult(sudoku_search.GAVE_UP, None, 7), result)
+
+        start = time.monotonic()
+        result = asyncio.run(sudoku_search.solve_async(self.puzzles[0], "first", propagate=False, timeout=0.05))
+        self.assertEqual(sudoku_search.GAVE_UP, result.status)
+        self.assertLess(time.monotonic() - start, 1)
+
+        async def cancel():
+            task = asyncio.create_task(sudoku_search.solve_async(self.puzzles[0], "first", propagate=False))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel())